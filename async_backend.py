@@ -0,0 +1,291 @@
+"""
+Async Backend
+asyncio versions of the LinkedIn scraper and Telegram notifier
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import time
+from threading import Thread, Lock
+
+import requests
+
+from linkedin_scraper import LinkedInJobScraper
+from telegram_notifier import TelegramNotifier
+from rate_limiter import TokenBucket, KeyedRateLimiter
+from log_setup import log_context
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopThread:
+    """An event loop running on a daemon thread
+
+    The sync facades hand their coroutines to this loop and wait for the
+    result, so the rest of the bot (engine, runners, database) stays
+    synchronous and all blocking work happens off the loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever, name="async-backend", daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and return its result"""
+        if self.thread.ident == threading.get_ident():
+            coro.close()
+            raise RuntimeError("EventLoopThread.run() called from its own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(self._in_context(coro, contextvars.copy_context()),
+                                                self.loop).result(timeout)
+
+    @staticmethod
+    async def _in_context(coro, context):
+        """Await coro with the caller's context variables (log cycle_id etc.)"""
+        for var, value in context.items():
+            var.set(value)
+        return await coro
+
+
+_event_loop = None
+_event_loop_lock = Lock()
+
+
+def get_event_loop_thread():
+    """Process-wide loop shared by the async scraper and notifier"""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = EventLoopThread()
+    return _event_loop
+
+
+class HttpClient:
+    """Async HTTP with aiohttp, or requests on worker threads without it
+
+    Without aiohttp, concurrency is bounded by the loop's default thread
+    pool. Returns (status, text) so callers don't depend on either library.
+    """
+
+    def __init__(self, headers=None, limit=100):
+        self.headers = headers or {}
+        self.limit = limit
+        self.session = None
+        if aiohttp is None:
+            logger.warning("⚠️ aiohttp not installed, the async backend sends requests on threads instead")
+            self.sync_session = requests.Session()
+            self.sync_session.headers.update(self.headers)
+
+    async def request(self, method, url, timeout=10, **kwargs):
+        if aiohttp is None:
+            response = await asyncio.to_thread(
+                self.sync_session.request, method, url, timeout=timeout, **kwargs
+            )
+            return response.status_code, response.text
+
+        if self.session is None:
+            # Sessions belong to the loop that created them
+            self.session = aiohttp.ClientSession(
+                headers=self.headers, connector=aiohttp.TCPConnector(limit=self.limit)
+            )
+        async with self.session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                        **kwargs) as response:
+            return response.status, await response.text()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncLinkedInJobScraper(LinkedInJobScraper):
+    """Scrapes every search term concurrently on one event loop
+
+    Pages of one search are still fetched in order (the 'older than the last
+    check' cut-off needs the previous page), but all terms and locations are
+    in flight at once. A token bucket replaces the fixed 2-5 second sleep and
+    a semaphore caps open connections. scrape_jobs() keeps the blocking
+    signature of LinkedInJobScraper.
+    """
+
+    is_async = True
+
+    def __init__(self, max_concurrency=8, requests_per_second=0.5, loop=None):
+        super().__init__()
+        self.loop = loop or get_event_loop_thread()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # Bursts of at most one second's worth, so a fresh bucket doesn't
+        # open with max_concurrency requests at once
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.http = HttpClient(self.headers, limit=max_concurrency)
+        # Optional ParsePool; without one pages are parsed on the loop
+        self.parse_pool = None
+
+    async def fetch_page(self, url):
+        if self.egress:
+            # Each endpoint has its own bucket, so the pool's total rate
+            # grows with its size instead of sharing rate_limiter. The
+            # semaphore is only held while sending, not while waiting for
+            # an endpoint's token
+            response = await self.egress.request_async('GET', url, limit=self.semaphore, timeout=15)
+            return response.status_code, response.text
+        await self.rate_limiter.acquire_async()
+        async with self.semaphore:
+            return await self.http.request('GET', url, timeout=15)
+
+    async def scrape_term_async(self, job_title, location="India", since=None, max_pages=1):
+        """All pages of one search, stopping at postings older than `since`"""
+        # Each gathered search runs in its own task, so contexts never mix
+        with log_context(search_term=job_title):
+            logger.info(f"🔍 Searching for: {job_title}")
+            jobs = []
+
+            for page in range(max_pages):
+                url = self.build_search_url(job_title, location, page)
+
+                try:
+                    fetch_started = time.perf_counter()
+                    status, text = await self.fetch_page(url)
+                    fetch_ms = round((time.perf_counter() - fetch_started) * 1000)
+
+                    if status != 200:
+                        logger.warning(f"⚠️ Status code {status} for {job_title}")
+                        self.failed_fetches += 1
+                        break
+
+                    if self.archive:
+                        await asyncio.to_thread(self.archive.append, text.encode('utf-8'),
+                                                url, job_title, location, page)
+
+                    limit = 10 if max_pages == 1 else None
+                    parse_started = time.perf_counter()
+                    if self.parse_pool:
+                        # Parsed on a worker process; the loop keeps fetching
+                        page_jobs = await self.parse_pool.parse_async(text.encode('utf-8'), job_title, limit)
+                    else:
+                        page_jobs = self.parse_job_listings(text, job_title, limit=limit)
+                    jobs.extend(page_jobs)
+                    logger.info(f"✅ Found {len(page_jobs)} jobs for {job_title}" + (f" (page {page + 1})" if page else ""),
+                                extra={'page': page + 1, 'jobs': len(page_jobs), 'fetch_ms': fetch_ms,
+                                       'parse_ms': round((time.perf_counter() - parse_started) * 1000)})
+
+                    if not page_jobs or self.reached_older_jobs(page_jobs, since):
+                        break
+
+                except Exception as e:
+                    logger.error(f"❌ Error scraping {job_title}: {str(e)}")
+                    self.failed_fetches += 1
+                    break
+
+            return jobs
+
+    async def scrape_jobs_async(self, job_titles, location="India", since=None, max_pages=1):
+        """Scrape all titles concurrently; results keep the order of job_titles"""
+        results = await asyncio.gather(*(
+            self.scrape_term_async(job_title, location, since, max_pages) for job_title in job_titles
+        ))
+        return [job for jobs in results for job in jobs]
+
+    def scrape_jobs(self, job_titles, location="India", since=None, max_pages=1):
+        return self.loop.run(self.scrape_jobs_async(job_titles, location, since, max_pages))
+
+    def close(self):
+        self.loop.run(self.http.close())
+        if self.parse_pool:
+            self.parse_pool.close()
+
+
+class AsyncTelegramNotifier(TelegramNotifier):
+    """Sends alerts to many chats concurrently within Telegram's limits
+
+    Telegram allows about one message per second per chat and ~30 per
+    second overall: a per-chat token bucket replaces the 1 second sleep
+    between messages, a global bucket caps the total, and chats are served
+    in parallel. The send methods keep TelegramNotifier's blocking
+    signatures; polling and setup calls are inherited unchanged.
+    """
+
+    is_async = True
+
+    def __init__(self, bot_token, chat_id, messages_per_second=25, max_concurrency=50, loop=None):
+        super().__init__(bot_token, chat_id)
+        self.loop = loop or get_event_loop_thread()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.rate_limiter = TokenBucket(messages_per_second)
+        self.chat_limiter = KeyedRateLimiter(1, capacity=1)
+        self.http = HttpClient(limit=max_concurrency)
+
+    async def send_message_async(self, message, parse_mode="HTML", chat_id=None):
+        chat_id = chat_id or self.chat_id
+        payload = {
+            'chat_id': chat_id,
+            'text': message,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': False
+        }
+
+        await self.chat_limiter.acquire_async(str(chat_id))
+        await self.rate_limiter.acquire_async()
+
+        try:
+            async with self.semaphore:
+                status, text = await self.http.request('POST', f"{self.api_url}/sendMessage",
+                                                       timeout=10, json=payload)
+
+            if status == 200:
+                return json.loads(text)['result']['message_id']
+            else:
+                logger.error(f"❌ Telegram API Error: {text}")
+                return False
+
+        except Exception as e:
+            logger.error(f"❌ Error sending Telegram message: {str(e)}")
+            return False
+
+    async def send_multiple_jobs_async(self, jobs, chat_id=None):
+        """Summary first, then one message per job, in order"""
+        sent = []
+        if not jobs:
+            return sent
+        await self.send_message_async(self.format_summary(jobs), chat_id=chat_id)
+        for i, job in enumerate(jobs, 1):
+            message_id = await self.send_message_async(self.format_job_message(job, index=i), chat_id=chat_id)
+            if message_id:
+                sent.append((job, i, message_id))
+        return sent
+
+    async def send_chat_async(self, chat_id, jobs, digest):
+        """One chat's alerts, then its digest, in order"""
+        sent = await self.send_multiple_jobs_async(jobs, chat_id=chat_id)
+        if digest:
+            await self.send_message_async(self.format_digest(digest), chat_id=chat_id)
+        return sent
+
+    async def send_routed_async(self, routed, digests=None):
+        digests = digests or {}
+        chat_ids = sorted(set(routed) | set(digests), key=str)
+        sent = await asyncio.gather(*(
+            self.send_chat_async(chat_id, routed.get(chat_id, []), digests.get(chat_id, []))
+            for chat_id in chat_ids
+        ))
+        return dict(zip(chat_ids, sent))
+
+    def send_message(self, message, parse_mode="HTML", chat_id=None):
+        return self.loop.run(self.send_message_async(message, parse_mode, chat_id))
+
+    def send_multiple_jobs(self, jobs, chat_id=None):
+        return self.loop.run(self.send_multiple_jobs_async(jobs, chat_id))
+
+    def send_routed(self, routed, digests=None):
+        return self.loop.run(self.send_routed_async(routed, digests))
+
+    def close(self):
+        self.loop.run(self.http.close())
+
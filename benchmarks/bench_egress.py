@@ -0,0 +1,121 @@
+"""
+Search-page throughput through an EgressPool of 1..N local proxy stand-ins
+
+Each stand-in is a small HTTP proxy on 127.0.0.1 that behaves like LinkedIn
+does towards one address: it answers search pages after a delay, and with
+429 once its client goes over the per-address rate. One stand-in can be
+made to block everything with 999 to show the pool routing around it.
+Prints pages/s, throttled responses and per-endpoint traffic for each size.
+
+Usage:
+    python benchmarks/bench_egress.py [--sizes 1,2,4,8] [--rate 5] [--requests 100]
+                                      [--threads 16] [--latency 0.05] [--blocked]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parse import make_page  # noqa: E402
+from egress_pool import Endpoint, EgressPool, make_session  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+
+PAGE = make_page(0, 10)
+
+
+class StandIn(ThreadingHTTPServer):
+    """Proxy stand-in answering every proxied GET itself"""
+
+    daemon_threads = True
+
+    def __init__(self, rate, latency, blocked=False):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        # Slightly over the client's budget, like a real per-IP limit
+        self.bucket = TokenBucket(rate * 1.2, capacity=2)
+        self.latency = latency
+        self.blocked = blocked
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency)
+        if server.blocked:
+            status, body = 999, b""
+        elif not server.bucket.try_acquire():
+            status, body = 429, b""
+        else:
+            status, body = 200, PAGE
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(size, args):
+    stand_ins = [StandIn(args.rate, args.latency, blocked=args.blocked and i == 0) for i in range(size)]
+    pool = EgressPool(
+        [Endpoint(s.url, make_session(proxy=s.url), rate=args.rate) for s in stand_ins],
+        cooldown=60
+    )
+    statuses = {}
+    lock = threading.Lock()
+
+    def fetch(n):
+        try:
+            status = pool.get(f"http://linkedin.test/jobs/search?keywords=devops&start={n}", timeout=10).status_code
+        except Exception as e:
+            status = type(e).__name__
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        list(executor.map(fetch, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    traffic = ', '.join(f"{e['requests']}" for e in pool.snapshot())
+    print(f"{size:>9}{statuses.get(200, 0) / elapsed:>11.1f}p/s{statuses.get(429, 0):>11}"
+          f"{sum(v for k, v in statuses.items() if k not in (200, 429)):>8}   {traffic}")
+
+    pool.close()
+    for stand_in in stand_ins:
+        stand_in.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1,2,4,8', help="pool sizes to try")
+    parser.add_argument('--rate', type=float, default=5, help="requests/s each address is allowed")
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per response")
+    parser.add_argument('--blocked', action='store_true', help="first stand-in answers 999 to everything")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.threads} threads, {args.rate:g} req/s per address\n")
+    print(f"{'endpoints':>9}{'ok':>14}{'throttled':>11}{'other':>8}   requests per endpoint")
+    for size in (int(s) for s in args.sizes.split(',')):
+        run(size, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Cold-start benchmark for main.py commands
+
+Runs `python -X importtime main.py <command>` in fresh processes against a
+throwaway copy of the config (Telegram disabled, temporary database) and
+reports, per command:
+    imports  - total import time, summed over top-level imports
+    startup  - wall time from interpreter start to the command's first output
+    heavy    - which of requests/bs4/flask/aiohttp got imported
+
+Usage:
+    python benchmarks/bench_importtime.py [--runs 5] [--commands test,once,stats] [--top 10]
+
+'test' and 'once' go on to hit the network; only their start-up is measured
+and they are stopped after --timeout seconds.
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('requests', 'bs4', 'flask', 'aiohttp')
+
+# "import time:       123 |        456 |   package.module"
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def make_config(workdir):
+    """Copy the repo's config with a temporary database and no Telegram"""
+    source = None
+    for name in ('config_render.py', 'config.py', 'config.example.py'):
+        if os.path.exists(os.path.join(ROOT, name)):
+            source = os.path.join(ROOT, name)
+            break
+
+    with open(source, encoding='utf-8') as f:
+        text = f.read()
+
+    db_path = os.path.join(workdir, 'bench.db')
+    text = re.sub(r'^DATABASE_PATH\s*=.*$', f'DATABASE_PATH = {db_path!r}', text, flags=re.M)
+    text = re.sub(r'^TELEGRAM_BOT_TOKEN\s*=.*$', 'TELEGRAM_BOT_TOKEN = "YOUR_BOT_TOKEN_HERE"', text, flags=re.M)
+    text = re.sub(r'^ENABLE_JOB_ENRICHMENT\s*=.*$', 'ENABLE_JOB_ENRICHMENT = False', text, flags=re.M)
+
+    path = os.path.join(workdir, 'bench_config.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+def run_command(command, config_path, timeout):
+    """One cold start; returns (import_us, startup_s, modules)"""
+    env = dict(os.environ, JOB_BOT_CONFIG=config_path, PYTHONDONTWRITEBYTECODE='1')
+    env.pop('REPL_ID', None)
+    env.pop('REPLIT_DEPLOYMENT', None)
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', os.path.join(ROOT, 'main.py'), command],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    # First line of output = the command has started doing its own work
+    first_line = process.stdout.readline()
+    startup = time.perf_counter() - started if first_line else None
+
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        _, stderr = process.communicate()
+
+    total_us = 0
+    modules = {}
+    for line in stderr.decode('utf-8', errors='replace').splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        modules[name] = cumulative
+        # Nested imports are indented; top-level ones already include them
+        if len(indent) <= 1:
+            total_us += cumulative
+    return total_us, startup, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--commands', default='test,once,stats')
+    parser.add_argument('--top', type=int, default=10, help="slowest top-level imports to list per command")
+    parser.add_argument('--timeout', type=float, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-importtime-')
+    try:
+        config_path = make_config(workdir)
+        # Create the database once so every run measures the steady state
+        run_command('stats', config_path, args.timeout)
+
+        print(f"{'command':<10}{'imports (ms)':>14}{'startup (ms)':>14}  heavy modules")
+        details = {}
+        for command in args.commands.split(','):
+            imports, startups, modules = [], [], {}
+            for _ in range(args.runs):
+                total_us, startup, modules = run_command(command, config_path, args.timeout)
+                imports.append(total_us / 1000)
+                if startup is not None:
+                    startups.append(startup * 1000)
+
+            heavy = [name for name in HEAVY_MODULES if name in modules]
+            startup_text = f"{statistics.median(startups):.1f}" if startups else "n/a"
+            print(f"{command:<10}{statistics.median(imports):>14.1f}{startup_text:>14}  {', '.join(heavy) or '-'}")
+            details[command] = modules
+
+        if args.top:
+            for command, modules in details.items():
+                print(f"\nSlowest imports for '{command}' (cumulative ms):")
+                for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+                    print(f"   {cumulative / 1000:8.1f}  {name}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+In-process vs process-pool parsing of LinkedIn search pages
+
+Generates search-result pages with realistic job-card markup, then times
+parsing batches of increasing size in-process and on a ParsePool. Prints
+pages/s for each and the smallest batch at which the pool wins.
+
+Usage:
+    python benchmarks/bench_parse.py [--workers 8] [--chunksize 4] [--cards 25]
+                                     [--batches 1,2,4,8,16,32,64,128,256]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parse_pool import ParsePool, parse_page  # noqa: E402
+
+CARD = """
+<li>
+  <div class="base-card relative w-full hover:no-underline focus:no-underline base-card--link base-search-card
+              base-search-card--link job-search-card" data-entity-urn="urn:li:jobPosting:{job_id}">
+    <a class="base-card__full-link absolute top-0 right-0 bottom-0 left-0 p-0 z-[2]"
+       href="https://in.linkedin.com/jobs/view/{slug}-{job_id}?refId=abc%3D%3D&amp;trackingId=def%3D%3D&amp;position={n}">
+      <span class="sr-only">{title}</span>
+    </a>
+    <div class="search-entity-media">
+      <img class="artdeco-entity-image artdeco-entity-image--square-4" alt="{company}" data-delayed-url="https://media.licdn.com/x.png">
+    </div>
+    <div class="base-search-card__info">
+      <h3 class="base-search-card__title">{title}</h3>
+      <h4 class="base-search-card__subtitle">
+        <a class="hidden-nested-link" href="https://in.linkedin.com/company/{company_slug}?trk=public_jobs">{company}</a>
+      </h4>
+      <div class="base-search-card__metadata">
+        <span class="job-search-card__location">{location}</span>
+        <div class="job-posting-benefits text-sm"><span class="job-posting-benefits__text">Actively Hiring</span></div>
+        <time class="job-search-card__listdate--new" datetime="2024-01-15">{hours} hours ago</time>
+      </div>
+    </div>
+  </div>
+</li>
+"""
+
+PAGE = """<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Jobs</title>
+<script>window.__data = {{"tracking": "{padding}"}};</script></head>
+<body><main><section class="two-pane-serp-page__results-list"><ul class="jobs-search__results-list">
+{cards}
+</ul></section></main></body></html>"""
+
+
+def make_page(page, cards):
+    items = []
+    for n in range(cards):
+        job_id = 3800000000 + page * 1000 + n
+        items.append(CARD.format(
+            job_id=job_id, n=n + 1, slug=f"devops-engineer-{n}",
+            title=f"DevOps Engineer {n}", company=f"Company {page}-{n}",
+            company_slug=f"company-{page}-{n}", location="Bengaluru, Karnataka, India",
+            hours=n % 23 + 1
+        ))
+    return PAGE.format(cards=''.join(items), padding='x' * 20000).encode('utf-8')
+
+
+def time_in_process(pages):
+    started = time.perf_counter()
+    for html_bytes in pages:
+        parse_page(html_bytes, "DevOps Engineer", None)
+    return time.perf_counter() - started
+
+
+def time_pool(pool, pages):
+    started = time.perf_counter()
+    for _ in pool.parse_many((html_bytes, "DevOps Engineer", None, None, None) for html_bytes in pages):
+        pass
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=4)
+    parser.add_argument('--cards', type=int, default=25, help="job cards per page")
+    parser.add_argument('--batches', default='1,2,4,8,16,32,64,128,256')
+    args = parser.parse_args()
+
+    batches = [int(b) for b in args.batches.split(',')]
+    pages = [make_page(i, args.cards) for i in range(max(batches))]
+    print(f"Page size: {len(pages[0]) / 1024:.0f} KiB, {args.cards} cards, "
+          f"{args.workers} workers, chunksize {args.chunksize}")
+
+    # Warm up the in-process parser (imports, first-call costs)
+    parse_page(pages[0], "DevOps Engineer", None)
+
+    started = time.perf_counter()
+    pool = ParsePool(args.workers, chunksize=args.chunksize)
+    # Workers start on first use; one full round brings them all up
+    time_pool(pool, pages[:args.workers * args.chunksize])
+    print(f"Pool start-up: {(time.perf_counter() - started) * 1000:.0f} ms (paid once per process)\n")
+
+    print(f"{'pages':>6}{'in-process':>14}{'pool':>14}{'speed-up':>10}")
+    speedups = []
+    try:
+        for batch in batches:
+            in_process = time_in_process(pages[:batch])
+            pooled = time_pool(pool, pages[:batch])
+            speedup = in_process / pooled if pooled else float('inf')
+            speedups.append((batch, speedup))
+            print(f"{batch:>6}{batch / in_process:>11.1f}p/s{batch / pooled:>11.1f}p/s{speedup:>9.2f}x")
+    finally:
+        pool.close()
+
+    # Smallest batch from which the pool stays ahead at every larger size
+    crossover = None
+    for batch, speedup in reversed(speedups):
+        if speedup <= 1:
+            break
+        crossover = batch
+
+    if crossover:
+        print(f"\nThe pool is faster from {crossover} page(s) per batch")
+    else:
+        print("\nThe pool never beat in-process parsing at these batch sizes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,558 @@
+"""
+Bot Engine
+The one scrape -> dedup -> filter -> notify loop, shared by every way of running the bot
+"""
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime
+
+from database import JobDatabase
+from job_filter import JobFilter
+from job_ranking import JobRanker, split_top_k
+from subscriptions import SubscriptionRouter
+from retention import RetentionTask
+from bot_state import BotState
+from profiler import CycleProfiler
+from log_setup import log_context, apply_levels
+from telegram_commands import TelegramCommandListener, wait_while_paused
+
+logger = logging.getLogger(__name__)
+
+# Events hooks can subscribe to with BotEngine.add_hook()
+#   cycle_start(iteration)
+#   job(job)              - once per new job that passed the filters
+#   cycle_end(summary)    - dict: time, iteration, jobs_found, new_jobs, stored, duration,
+#                           plus error (the message) when the cycle failed
+#   error(exception)
+HOOK_EVENTS = ('cycle_start', 'job', 'cycle_end', 'error')
+
+# Wait before retrying after a failed cycle (capped at CHECK_INTERVAL)
+ERROR_RETRY_SECONDS = 60
+
+
+class BotEngine:
+    """Owns the bot's components and runs its cycles
+
+    Runners (see runners.py) only decide where the loop runs: foreground,
+    a background thread, an asyncio task or a separate process. Anything
+    that wants to observe the bot subscribes to hooks or reads metrics().
+    """
+
+    def __init__(self, config, db_path=None, offline=False, notifications=None):
+        """
+        Args:
+            config: settings object (the ConfigManager from config_loader)
+            db_path: overrides DATABASE_PATH (e.g. for replays)
+            offline: skip components that reach the network on their own
+                (page archive, detail enrichment)
+            notifications: force notifications on/off instead of following config
+        """
+        self.config = config
+        self.offline = offline
+
+        self.scraper = self._create_scraper()
+        if getattr(config, 'PAGE_ARCHIVE_DIR', None) and not offline:
+            from page_archive import PageArchive
+            self.scraper.archive = PageArchive(config.PAGE_ARCHIVE_DIR)
+
+        # Spread LinkedIn requests over EGRESS_PROXIES / EGRESS_SOURCE_ADDRESSES
+        if (getattr(config, 'EGRESS_PROXIES', None) or getattr(config, 'EGRESS_SOURCE_ADDRESSES', None)) and not offline:
+            from egress_pool import EgressPool
+            self.scraper.egress = EgressPool.from_settings(
+                getattr(config, 'EGRESS_PROXIES', []),
+                getattr(config, 'EGRESS_SOURCE_ADDRESSES', []),
+                headers=self.scraper.headers,
+                rate=getattr(config, 'LINKEDIN_REQUESTS_PER_SECOND', 0.5),
+                cooldown=getattr(config, 'EGRESS_COOLDOWN', 300)
+            )
+
+        self.db = JobDatabase(db_path or config.DATABASE_PATH)
+        # Counters for stats/commands, loaded once and then kept in memory
+        self.state = BotState()
+        self.state.load_from_db(self.db)
+        self.job_filter = JobFilter(getattr(config, 'JOB_FILTERS', {}))
+        self.ranker = JobRanker(getattr(config, 'JOB_RANKING', {}))
+        self.router = SubscriptionRouter(
+            self.db, config.TELEGRAM_CHAT_ID, config.JOB_TITLES, config.LOCATION
+        )
+        self.retention = RetentionTask(
+            self.db,
+            days=config.CLEAR_OLD_JOBS_AFTER_DAYS,
+            interval=getattr(config, 'RETENTION_INTERVAL', 3600),
+            batch_size=getattr(config, 'RETENTION_BATCH_SIZE', 500),
+            archive_dir=getattr(config, 'JOBS_ARCHIVE_DIR', None),
+            state=self.state
+        )
+
+        # Optional detail-page fetching for new jobs
+        self.enricher = None
+        # Alerts sent before their details arrived: {job_id: (job, [(chat_id, index, message_id)])}
+        self.awaiting_details = {}
+        if getattr(config, 'ENABLE_JOB_ENRICHMENT', False) and not offline:
+            self._create_enricher()
+
+        # Initialize Telegram notifier if configured
+        self.notifier = None
+        self.notifications_enabled = False
+        if config.TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN_HERE" and notifications is not False:
+            self.notifier = self._create_notifier()
+            self.notifications_enabled = True
+        elif notifications is None:
+            logger.warning("⚠️ Telegram not configured. Notifications disabled.")
+
+        self.hooks = {event: [] for event in HOOK_EVENTS}
+        self.iteration = 0
+        self.started = False
+        self.command_listener = None
+        # Profiles of requested cycles are written next to the database
+        self.profiler = CycleProfiler(os.path.dirname(os.path.abspath(db_path or config.DATABASE_PATH)))
+
+    def _create_scraper(self):
+        """LinkedInJobScraper, or its asyncio version with ASYNC_BACKEND"""
+        if getattr(self.config, 'ASYNC_BACKEND', False):
+            from async_backend import AsyncLinkedInJobScraper
+            scraper = AsyncLinkedInJobScraper(
+                max_concurrency=getattr(self.config, 'MAX_CONCURRENT_REQUESTS', 8),
+                requests_per_second=getattr(self.config, 'LINKEDIN_REQUESTS_PER_SECOND', 0.5)
+            )
+            import multiprocessing
+            workers = getattr(self.config, 'PARSE_WORKERS', 0)
+            if workers and multiprocessing.current_process().daemon:
+                # e.g. under ProcessRunner: daemon processes can't start workers
+                logger.warning("⚠️ PARSE_WORKERS ignored in a daemon process, parsing in-process")
+            elif workers:
+                from parse_pool import ParsePool
+                scraper.parse_pool = ParsePool(workers)
+            return scraper
+        from linkedin_scraper import LinkedInJobScraper
+        return LinkedInJobScraper()
+
+    def _create_notifier(self):
+        """TelegramNotifier, or its asyncio version with ASYNC_BACKEND"""
+        config = self.config
+        if getattr(config, 'ASYNC_BACKEND', False):
+            from async_backend import AsyncTelegramNotifier
+            return AsyncTelegramNotifier(
+                config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID,
+                messages_per_second=getattr(config, 'TELEGRAM_MESSAGES_PER_SECOND', 25)
+            )
+        from telegram_notifier import TelegramNotifier
+        return TelegramNotifier(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
+
+    def _create_enricher(self):
+        from job_enricher import JobEnricher
+        from rate_limiter import TokenBucket
+        # Share the async scraper's LinkedIn budget; the sync scraper paces
+        # itself with sleeps, so detail pages get a bucket of their own
+        rate_limiter = getattr(self.scraper, 'rate_limiter', None) or TokenBucket(
+            getattr(self.config, 'LINKEDIN_REQUESTS_PER_SECOND', 0.5)
+        )
+        self.enricher = JobEnricher(
+            self.db,
+            workers=getattr(self.config, 'ENRICHMENT_WORKERS', 4),
+            headers=self.scraper.headers,
+            rate_limiter=rate_limiter
+        )
+        # Detail pages count against the same per-endpoint budgets
+        self.enricher.egress = self.scraper.egress
+
+    # ------------------------------------------------------------------
+    # Hooks and metrics
+    # ------------------------------------------------------------------
+
+    def add_hook(self, event, callback):
+        """Call callback on an engine event (see HOOK_EVENTS)"""
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event '{event}', expected one of: {', '.join(HOOK_EVENTS)}")
+        self.hooks[event].append(callback)
+
+    def _emit(self, event, *args):
+        for callback in self.hooks[event]:
+            try:
+                callback(*args)
+            except Exception as e:
+                # A broken observer must never take the bot down
+                logger.warning(f"⚠️ Error in {event} hook: {str(e)}")
+
+    def metrics(self):
+        """Counters shared by every runner (no database access)"""
+        metrics = self.state.snapshot()
+        metrics['iteration'] = self.iteration
+        metrics['subscribers'] = len(self.router.index)
+        metrics['search_terms'] = self.router.search_terms
+        metrics['filtered'] = sum(self.job_filter.stats.values())
+        if self.scraper.egress:
+            metrics['egress'] = self.scraper.egress.snapshot()
+        return metrics
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, startup_title="Job Scraper Started!"):
+        """One-time startup: banner, Telegram check, background services"""
+        if self.started:
+            return
+        self.started = True
+        config = self.config
+
+        logger.info("=" * 70)
+        logger.info("🤖 LinkedIn Job Automation Bot Started")
+        logger.info("=" * 70)
+        logger.info(f"⏰ Check interval: {config.CHECK_INTERVAL} seconds ({config.CHECK_INTERVAL/60} minutes)")
+        logger.info(f"🔍 Job titles: {', '.join(self.router.search_terms)}")
+        logger.info(f"📍 Location: {config.LOCATION}")
+        logger.info(f"📱 Notifications: {'Enabled' if self.notifications_enabled else 'Disabled'}")
+        logger.info("=" * 70)
+
+        # Test Telegram connection
+        if self.notifications_enabled:
+            logger.info("\n🔌 Testing Telegram connection...")
+            if self.notifier.test_connection():
+                # Send startup notification
+                startup_msg = f"✅ <b>{startup_title}</b>\n\n"
+                startup_msg += f"🔍 Monitoring: {', '.join(config.JOB_TITLES)}\n"
+                startup_msg += f"📍 Location: {config.LOCATION}\n"
+                startup_msg += f"⏰ Check interval: {config.CHECK_INTERVAL/60} minutes\n"
+                startup_msg += f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                self.notifier.send_message(startup_msg)
+
+        # Old jobs are pruned in the background between cycles
+        self.retention.start()
+
+        # Config edits (or SIGHUP) are picked up between cycles; signal
+        # handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            config.watch_signal()
+            # kill -USR1 <pid> profiles the next cycle
+            if hasattr(signal, 'SIGUSR1'):
+                signal.signal(signal.SIGUSR1, lambda signum, frame: self.profiler.request(1))
+
+        # /stats, /recent, /search, /pause from Telegram
+        if self.notifications_enabled and getattr(config, 'ENABLE_TELEGRAM_COMMANDS', True):
+            self.command_listener = TelegramCommandListener(
+                self.notifier, self.state, config.TELEGRAM_CHAT_ID,
+                allowed_chats=lambda: self.router.index.chat_ids()
+            )
+            self.command_listener.start()
+
+    def shutdown(self):
+        """Stop background services and say goodbye on Telegram"""
+        logger.info("\n\n⏹️ Stopping job scraper...")
+        self.retention.stop()
+        if self.command_listener:
+            self.command_listener.stop()
+
+        if self.notifications_enabled:
+            shutdown_msg = f"⏹️ <b>Job Scraper Stopped</b>\n\n"
+            shutdown_msg += f"Total iterations: {self.iteration}\n"
+            shutdown_msg += f"Stopped at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            self.notifier.send_message(shutdown_msg)
+
+        # Async backends hold connection pools on their event loop
+        for component in (self.scraper, self.notifier):
+            if getattr(component, 'is_async', False):
+                component.close()
+
+        logger.info("👋 Goodbye!")
+
+    def before_cycle(self, stop_event=None):
+        """Cycle-boundary work: honour /pause, apply config edits"""
+        # Hold here while paused with /pause
+        wait_while_paused(self.state, stop_event=stop_event)
+
+        # Apply config edits at the cycle boundary
+        changed = self.config.reload_if_changed()
+        if changed:
+            self.apply_config_changes(changed)
+
+    def next_delay(self, succeeded):
+        """Seconds to wait after a cycle"""
+        if succeeded:
+            return self.config.CHECK_INTERVAL
+        return min(ERROR_RETRY_SECONDS, self.config.CHECK_INTERVAL)
+
+    def run_forever(self, stop_event=None):
+        """Run cycles until stop_event is set (or forever)"""
+        stop_event = stop_event or threading.Event()
+
+        while not stop_event.is_set():
+            logger.info(f"\n{'='*70}")
+            logger.info(f"🔄 Iteration #{self.iteration + 1}")
+
+            self.before_cycle(stop_event)
+            if stop_event.is_set():
+                break
+
+            succeeded = self.run_cycle()
+
+            # Wait for next iteration
+            delay = self.next_delay(succeeded)
+            next_check = datetime.fromtimestamp(time.time() + delay).strftime('%Y-%m-%d %H:%M:%S')
+            logger.info(f"\n⏳ Waiting {delay} seconds until next check...")
+            logger.info(f"⏰ Next check at: {next_check}")
+            stop_event.wait(delay)
+
+    # ------------------------------------------------------------------
+    # The pipeline
+    # ------------------------------------------------------------------
+
+    def run_cycle(self):
+        """Scrape every subscribed search once and process the results
+
+        Returns True on success; errors are reported, never raised.
+        """
+        # Every record logged during the cycle carries its cycle_id
+        with log_context(cycle_id=self.iteration + 1):
+            # The only cost of profiling support while it is switched off
+            if self.profiler.remaining:
+                with self.profiler.capture(f"cycle{self.iteration + 1}"):
+                    return self._run_cycle()
+            return self._run_cycle()
+
+    def _run_cycle(self):
+        self.iteration += 1
+        logger.info("\n" + "=" * 70)
+        logger.info(f"🚀 Job Scraper Running - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info("=" * 70)
+
+        self._emit('cycle_start', self.iteration)
+        # Retention pauses while a cycle runs
+        self.retention.cycle_started()
+        started = time.perf_counter()
+        jobs = []
+        ended = False
+
+        try:
+            # Scrape every subscriber's searches once, paging back only
+            # as far as the previous successful check
+            self.router.reload()
+            failed_before = self.scraper.failed_fetches
+            jobs = self.router.scrape(
+                self.scraper,
+                since=self.db.get_last_scrape_time(),
+                max_pages=getattr(self.config, 'MAX_PAGES_PER_SEARCH', 1)
+            )
+
+            logger.info(f"\n📊 Found {len(jobs)} total jobs",
+                        extra={'jobs_found': len(jobs), 'scrape_ms': round((time.perf_counter() - started) * 1000)})
+
+            self.process_jobs(jobs, started=started, complete=self.scraper.failed_fetches == failed_before)
+            ended = True
+
+            # Show stats
+            stats = self.state.snapshot()
+            logger.info(f"\n📈 Database Stats:")
+            logger.info(f"   Total jobs tracked: {stats['total_jobs']}")
+            logger.info(f"   Total scrapes: {stats['total_scrapes']}")
+            logger.info(f"   Jobs in last 24h: {stats['recent_jobs']}")
+
+            return True
+
+        except Exception as e:
+            logger.error(f"\n❌ Error during scraping: {str(e)}", exc_info=True)
+
+            if self.notifications_enabled:
+                error_msg = f"⚠️ <b>Job Scraper Error</b>\n\n"
+                error_msg += f"Error: {str(e)}\n"
+                error_msg += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                self.notifier.send_message(error_msg)
+
+            self._emit('error', e)
+            if not ended:
+                self._emit('cycle_end', self._cycle_summary(started, len(jobs), error=str(e)))
+            return False
+
+        finally:
+            self.retention.cycle_finished()
+
+    def process_jobs(self, jobs, started=None, complete=True, end_cycle=True):
+        """Dedup, filter, order, enrich, record and notify a batch of scraped jobs
+
+        complete=False records that some search failed to fetch, so the next
+        cycle pages back to the last complete one. end_cycle=False skips the
+        scrape log entry and cycle_end, for a cycle fed in several batches
+        that finish_cycle() closes. Returns the new jobs that passed the
+        filters.
+        """
+        started = started or time.perf_counter()
+        config = self.config
+
+        # Details that finished loading since the last cycle go into its alerts
+        self.attach_late_details()
+
+        # Filter new jobs
+        new_jobs = self.db.get_new_jobs(jobs)
+        stored = len(new_jobs)
+
+        logger.info(f"✨ {len(new_jobs)} new jobs")
+
+        # Drop jobs that fail the keyword filters
+        new_jobs = self.apply_filters(new_jobs)
+
+        # Freshest postings are enriched first
+        new_jobs.sort(key=lambda job: job.get('posted_at') or '', reverse=True)
+
+        # Add description/seniority/applicants from the detail pages
+        loading = []
+        if new_jobs and self.enricher and getattr(config, 'ENABLE_JOB_ENRICHMENT', False):
+            enriched, loading = self.enricher.enrich(new_jobs, wait=getattr(config, 'ENRICHMENT_WAIT', 0))
+            logger.info(f"📝 Enriched {enriched}/{len(new_jobs)} job(s) with details")
+
+        # Score by keywords, freshness and company weights; each chat's best
+        # TOP_K are picked from its own jobs when sending
+        self.ranker.score(new_jobs)
+
+        # Log scraping activity
+        self.state.record_jobs(new_jobs, stored)
+        if end_cycle:
+            self._log_scrape(len(jobs), len(new_jobs), complete)
+
+        for job in new_jobs:
+            self._emit('job', job)
+
+        # Send notifications for new jobs
+        if new_jobs and self.notifications_enabled and config.ENABLE_NOTIFICATIONS:
+            routed = self.router.route(new_jobs, jobs)
+
+            # Each chat gets its TOP_K best jobs as alerts and the rest in one digest
+            top_k = getattr(config, 'TOP_K', None)
+            alerts, digests = {}, {}
+            for chat_id, chat_jobs in routed.items():
+                alerts[chat_id], rest = split_top_k(chat_jobs, top_k)
+                if rest:
+                    digests[chat_id] = rest
+
+            logger.info(f"\n📱 Sending {len(new_jobs)} notification(s) to {len(routed)} subscriber(s)..."
+                  + (f" ({sum(map(len, digests.values()))} in digests)" if digests else ""))
+            sent = self.notifier.send_routed(alerts, digests)
+            logger.info("✅ Notifications sent!")
+
+            # Remember alerts whose details are still loading, to edit them later
+            loading = set(loading)
+            for chat_id, messages in (sent or {}).items():
+                for job, index, message_id in messages:
+                    if job['job_id'] in loading:
+                        entry = self.awaiting_details.setdefault(job['job_id'], (job, []))
+                        entry[1].append((chat_id, index, message_id))
+        elif new_jobs:
+            logger.info("\n📋 New jobs found (notifications disabled):")
+            for job in new_jobs:
+                logger.info(f"   - {job['title']} at {job['company']}")
+        else:
+            logger.info("\n😴 No new jobs found")
+
+        if end_cycle:
+            self._end_cycle(started, len(jobs), len(new_jobs), stored)
+
+        return new_jobs
+
+    def finish_cycle(self, started, jobs_found, new_jobs, stored, complete=True):
+        """Log and announce a cycle whose batches went through process_jobs(end_cycle=False)"""
+        self._log_scrape(jobs_found, new_jobs, complete)
+        self._end_cycle(started, jobs_found, new_jobs, stored)
+
+    def _log_scrape(self, jobs_found, new_jobs, complete=True):
+        self.db.log_scrape(jobs_found, new_jobs, self.router.search_terms, complete=complete)
+        self.state.record_check(jobs_found, new_jobs)
+
+    def _end_cycle(self, started, jobs_found, new_jobs, stored):
+        summary = self._cycle_summary(started, jobs_found, new_jobs, stored)
+        logger.info(f"⏱️ Cycle finished in {summary['duration']}s",
+                    extra={key: value for key, value in summary.items() if key != 'time'})
+        self._emit('cycle_end', summary)
+
+    def _cycle_summary(self, started, jobs_found=0, new_jobs=0, stored=0, **extra):
+        """The dict passed to cycle_end hooks"""
+        return dict({
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'iteration': self.iteration,
+            'jobs_found': jobs_found,
+            'new_jobs': new_jobs,
+            'stored': stored,
+            'duration': round(time.perf_counter() - started, 3),
+        }, **extra)
+
+    def attach_late_details(self):
+        """Edit alerts that were sent before their job details had loaded"""
+        if not self.awaiting_details or not self.enricher or not self.notifier:
+            return
+
+        details = self.db.get_job_details(list(self.awaiting_details))
+        edited = 0
+        for job_id, fields in details.items():
+            job, messages = self.awaiting_details.pop(job_id)
+            job.update(fields)
+            for chat_id, index, message_id in messages:
+                if self.notifier.edit_message(chat_id, message_id, self.notifier.format_job_message(job, index)):
+                    edited += 1
+
+        # Fetches that failed are no longer pending and will never arrive
+        still_loading = self.enricher.loading(self.awaiting_details)
+        for job_id in set(self.awaiting_details) - still_loading:
+            del self.awaiting_details[job_id]
+
+        if edited:
+            logger.info(f"📝 Added details to {edited} alert(s) sent earlier")
+
+    def apply_filters(self, new_jobs):
+        """Run new jobs through JOB_FILTERS and report what each rule removed"""
+        kept, removed = self.job_filter.apply(new_jobs)
+
+        if removed:
+            logger.info(f"🚫 Filtered out {sum(removed.values())} job(s):")
+            for rule, count in removed.most_common():
+                logger.info(f"   - {rule}: {count}")
+
+        return kept
+
+    def apply_config_changes(self, changed):
+        """Push reloaded settings into the running components
+
+        Everything is updated in place: the DB, HTTP sessions, worker
+        threads and caches carry on as they are.
+        """
+        config = self.config
+
+        if 'JOB_FILTERS' in changed:
+            self.job_filter = JobFilter(getattr(config, 'JOB_FILTERS', {}))
+
+        if 'JOB_RANKING' in changed:
+            self.ranker = JobRanker(getattr(config, 'JOB_RANKING', {}))
+
+        if {'LOG_LEVEL', 'LOG_LEVELS'} & set(changed):
+            apply_levels(config)
+
+        if {'TELEGRAM_CHAT_ID', 'JOB_TITLES', 'LOCATION'} & set(changed):
+            self.router.update_defaults(config.TELEGRAM_CHAT_ID, config.JOB_TITLES, config.LOCATION)
+
+        if {'TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID'} & set(changed):
+            if config.TELEGRAM_BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
+                self.notifications_enabled = False
+            elif self.notifier:
+                self.notifier.update_credentials(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
+                self.notifications_enabled = True
+            else:
+                self.notifier = self._create_notifier()
+                self.notifications_enabled = True
+
+        self.retention.configure(
+            days=config.CLEAR_OLD_JOBS_AFTER_DAYS,
+            interval=getattr(config, 'RETENTION_INTERVAL', 3600),
+            batch_size=getattr(config, 'RETENTION_BATCH_SIZE', 500),
+            archive_dir=getattr(config, 'JOBS_ARCHIVE_DIR', None)
+        )
+
+        if 'PAGE_ARCHIVE_DIR' in changed and not self.offline:
+            if getattr(config, 'PAGE_ARCHIVE_DIR', None):
+                from page_archive import PageArchive
+                self.scraper.archive = PageArchive(config.PAGE_ARCHIVE_DIR)
+            else:
+                self.scraper.archive = None
+
+        # Switching enrichment off leaves the workers idle for reuse
+        if getattr(config, 'ENABLE_JOB_ENRICHMENT', False) and not self.enricher and not self.offline:
+            self._create_enricher()
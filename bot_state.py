@@ -0,0 +1,106 @@
+"""
+Bot State
+In-memory counters and recent jobs, so status queries never hit the database
+"""
+from collections import deque
+from datetime import datetime, timedelta
+from threading import Lock
+
+
+class BotState:
+    """Materialized view of the bot's activity
+
+    Loaded from the database once at startup, then kept current by
+    record_jobs(), record_check() and record_pruned(); readers (Telegram commands, the web server) get
+    consistent snapshots without running queries.
+    """
+
+    def __init__(self, recent_size=200):
+        self.lock = Lock()
+        self.total_jobs = 0
+        self.total_scrapes = 0
+        self.last_check = None
+        self.last_jobs_found = 0
+        self.last_new_jobs = 0
+        self.paused = False
+        # Newest first: dicts with title/company/location/url/posted_date
+        self.recent_jobs = deque(maxlen=recent_size)
+        # Times jobs were added, oldest first, for the rolling 24h count
+        self.job_times = deque()
+
+    def load_from_db(self, db):
+        """Initialize counters with a single pass over the database"""
+        stats = db.get_stats()
+        recent = db.get_recent_jobs(limit=self.recent_jobs.maxlen)
+        job_times = db.get_job_times_since(datetime.now() - timedelta(days=1))
+
+        with self.lock:
+            self.total_jobs = stats['total_jobs']
+            self.total_scrapes = stats['total_scrapes']
+            self.recent_jobs.clear()
+            for title, company, location, posted_date, created_at in recent:
+                self.recent_jobs.append({
+                    'title': title, 'company': company, 'location': location,
+                    'posted_date': posted_date, 'url': None
+                })
+            self.job_times = deque(job_times)
+
+    def record_check(self, jobs_found, new_jobs):
+        """Count one finished cycle that found jobs_found jobs, new_jobs of them new"""
+        with self.lock:
+            self.total_scrapes += 1
+            self.last_check = datetime.now()
+            self.last_jobs_found = jobs_found
+            self.last_new_jobs = new_jobs
+
+    def record_jobs(self, new_jobs, stored=None):
+        """Fold newly found jobs into the counters and recent jobs
+
+        stored is how many jobs were added to the database, which includes
+        jobs the filters dropped; defaults to len(new_jobs).
+        """
+        now = datetime.now()
+        stored = len(new_jobs) if stored is None else stored
+        with self.lock:
+            self.total_jobs += stored
+            for job in reversed(new_jobs):
+                self.recent_jobs.appendleft({
+                    key: job.get(key) for key in ('title', 'company', 'location', 'posted_date', 'url')
+                })
+            self.job_times.extend([now] * stored)
+
+    def record_pruned(self, jobs_deleted, history_deleted=0):
+        """Take rows removed by retention out of the totals"""
+        with self.lock:
+            self.total_jobs = max(0, self.total_jobs - jobs_deleted)
+            self.total_scrapes = max(0, self.total_scrapes - history_deleted)
+
+    def snapshot(self):
+        """Current counters as a plain dict"""
+        cutoff = datetime.now() - timedelta(days=1)
+        with self.lock:
+            while self.job_times and self.job_times[0] < cutoff:
+                self.job_times.popleft()
+            return {
+                'total_jobs': self.total_jobs,
+                'total_scrapes': self.total_scrapes,
+                'recent_jobs': len(self.job_times),
+                'last_check': self.last_check,
+                'last_jobs_found': self.last_jobs_found,
+                'last_new_jobs': self.last_new_jobs,
+                'paused': self.paused,
+            }
+
+    def latest_jobs(self, limit=5):
+        with self.lock:
+            return list(self.recent_jobs)[:limit]
+
+    def search_recent(self, term, limit=10):
+        """Recent jobs whose title, company or location contains term"""
+        term = term.lower()
+        with self.lock:
+            matches = [
+                job for job in self.recent_jobs
+                if any(term in (job.get(field) or '').lower() for field in ('title', 'company', 'location'))
+            ]
+        return matches[:limit]
@@ -0,0 +1,216 @@
+"""
+Config Loader
+Reloads config_render.py / config.py while the bot is running
+"""
+import importlib.util
+import logging
+import os
+import signal
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+# Searched in this order, like the original 'import config_render as config'
+CONFIG_MODULES = ('config_render', 'config')
+
+# Settings that are wired up once at startup; changes are reported but only
+# take effect after a restart
+RESTART_REQUIRED = ('DATABASE_PATH', 'WEB_SERVER', 'WEB_THREADS', 'SSE_PORT', 'ENRICHMENT_WORKERS',
+                    'ASYNC_BACKEND', 'MAX_CONCURRENT_REQUESTS', 'LINKEDIN_REQUESTS_PER_SECOND',
+                    'TELEGRAM_MESSAGES_PER_SECOND', 'PARSE_WORKERS',
+                    'ENABLE_LOGGING', 'LOG_FILE', 'LOG_MAX_BYTES', 'LOG_BACKUP_COUNT',
+                    'EGRESS_PROXIES', 'EGRESS_SOURCE_ADDRESSES', 'EGRESS_COOLDOWN')
+
+# Accepted values for LOG_LEVEL and LOG_LEVELS
+LOG_LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+def find_config_path():
+    """Path of the first config module that exists (or $JOB_BOT_CONFIG)"""
+    if os.environ.get('JOB_BOT_CONFIG'):
+        return os.environ['JOB_BOT_CONFIG']
+    for name in CONFIG_MODULES:
+        spec = importlib.util.find_spec(name)
+        if spec and spec.origin:
+            return spec.origin
+    raise ImportError(f"No configuration module found (tried: {', '.join(CONFIG_MODULES)})")
+
+
+def load_settings(path):
+    """Execute a config file and return its UPPER_CASE settings"""
+    spec = importlib.util.spec_from_file_location('_job_bot_config', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return {name: getattr(module, name) for name in dir(module) if name.isupper()}
+
+
+def validate_settings(settings):
+    """Return a list of problems; an empty list means the settings are usable"""
+    errors = []
+
+    titles = settings.get('JOB_TITLES')
+    if not isinstance(titles, (list, tuple)) or not titles \
+            or not all(isinstance(t, str) and t.strip() for t in titles):
+        errors.append("JOB_TITLES must be a non-empty list of strings")
+
+    if not isinstance(settings.get('LOCATION'), str):
+        errors.append("LOCATION must be a string")
+
+    interval = settings.get('CHECK_INTERVAL')
+    if not isinstance(interval, (int, float)) or isinstance(interval, bool) or interval <= 0:
+        errors.append("CHECK_INTERVAL must be a positive number of seconds")
+
+    pages = settings.get('MAX_PAGES_PER_SEARCH', 1)
+    if not isinstance(pages, int) or pages < 1:
+        errors.append("MAX_PAGES_PER_SEARCH must be an integer >= 1")
+
+    days = settings.get('CLEAR_OLD_JOBS_AFTER_DAYS', 30)
+    if not isinstance(days, (int, float)) or days <= 0:
+        errors.append("CLEAR_OLD_JOBS_AFTER_DAYS must be a positive number")
+
+    for name in ('LINKEDIN_REQUESTS_PER_SECOND', 'TELEGRAM_MESSAGES_PER_SECOND', 'MAX_CONCURRENT_REQUESTS'):
+        value = settings.get(name, 1)
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            errors.append(f"{name} must be a positive number")
+
+    workers = settings.get('PARSE_WORKERS', 0)
+    if not isinstance(workers, int) or isinstance(workers, bool) or workers < 0:
+        errors.append("PARSE_WORKERS must be an integer >= 0")
+
+    top_k = settings.get('TOP_K')
+    if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k < 1):
+        errors.append("TOP_K must be None or an integer >= 1")
+
+    ranking = settings.get('JOB_RANKING', {})
+    if not isinstance(ranking, dict):
+        errors.append("JOB_RANKING must be a dict")
+    else:
+        try:
+            from job_ranking import JobRanker
+            JobRanker(ranking)
+        except Exception as e:
+            errors.append(f"JOB_RANKING is invalid: {str(e)}")
+
+    for name in ('EGRESS_PROXIES', 'EGRESS_SOURCE_ADDRESSES'):
+        value = settings.get(name, [])
+        if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) and item for item in value):
+            errors.append(f"{name} must be a list of strings")
+
+    cooldown = settings.get('EGRESS_COOLDOWN', 300)
+    if not isinstance(cooldown, (int, float)) or isinstance(cooldown, bool) or cooldown <= 0:
+        errors.append("EGRESS_COOLDOWN must be a positive number of seconds")
+
+    if settings.get('LOG_LEVEL', 'INFO') not in LOG_LEVEL_NAMES:
+        errors.append(f"LOG_LEVEL must be one of: {', '.join(LOG_LEVEL_NAMES)}")
+
+    levels = settings.get('LOG_LEVELS', {})
+    if not isinstance(levels, dict) or any(level not in LOG_LEVEL_NAMES for level in levels.values()):
+        errors.append(f"LOG_LEVELS must map module names to one of: {', '.join(LOG_LEVEL_NAMES)}")
+
+    for name in ('LOG_MAX_BYTES', 'LOG_BACKUP_COUNT'):
+        value = settings.get(name, 1)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            errors.append(f"{name} must be an integer >= 0")
+
+    filters = settings.get('JOB_FILTERS', {})
+    if not isinstance(filters, dict):
+        errors.append("JOB_FILTERS must be a dict")
+    else:
+        try:
+            from job_filter import JobFilter
+            JobFilter(filters)
+        except Exception as e:
+            errors.append(f"JOB_FILTERS is invalid: {str(e)}")
+
+    return errors
+
+
+class ConfigManager:
+    """Attribute-style access to the current settings, swapped atomically
+
+    Code reads settings as config.CHECK_INTERVAL, exactly like the config
+    module. reload_if_changed() is only called at cycle boundaries, so a
+    cycle always sees one consistent set of settings.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or find_config_path()
+        self.mtime = os.path.getmtime(self.path)
+        settings = load_settings(self.path)
+
+        errors = validate_settings(settings)
+        if errors:
+            raise ValueError("Invalid configuration: " + "; ".join(errors))
+
+        self.current = SimpleNamespace(**settings)
+        self.reload_requested = False
+
+    def __getattr__(self, name):
+        # Only called for names not set on the manager itself
+        return getattr(self.current, name)
+
+    def watch_signal(self):
+        """Reload on SIGHUP as well as on file changes (main thread, POSIX only)"""
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
+
+    def request_reload(self):
+        self.reload_requested = True
+
+    def reload_if_changed(self):
+        """Reload the config file if it changed; returns {name: (old, new)}
+
+        Invalid files are rejected as a whole and the running settings stay
+        in place.
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return {}
+
+        if mtime == self.mtime and not self.reload_requested:
+            return {}
+
+        self.mtime = mtime
+        self.reload_requested = False
+
+        try:
+            settings = load_settings(self.path)
+        except Exception as e:
+            logger.error(f"❌ Config reload failed, keeping current settings: {str(e)}")
+            return {}
+
+        errors = validate_settings(settings)
+        if errors:
+            logger.error("❌ Config reload rejected, keeping current settings:")
+            for error in errors:
+                logger.error(f"   - {error}")
+            return {}
+
+        old = vars(self.current)
+        for name in RESTART_REQUIRED:
+            if name in old and settings.get(name) != old[name]:
+                logger.warning(f"⚠️ {name} changed; restart the bot to apply it")
+                settings[name] = old[name]
+
+        changed = {
+            name: (old.get(name), settings.get(name))
+            for name in set(old) | set(settings)
+            if old.get(name) != settings.get(name)
+        }
+
+        if changed:
+            self.current = SimpleNamespace(**settings)
+            logger.info(f"🔄 Config reloaded: {', '.join(sorted(changed))}")
+        return changed
+
+
+_manager = None
+
+
+def get_config():
+    """Process-wide ConfigManager, shared by main.py and keep_alive.py"""
+    global _manager
+    if _manager is None:
+        _manager = ConfigManager()
+    return _manager
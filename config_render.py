@@ -24,14 +24,67 @@ EXPERIENCE_LEVEL = "Entry level & Associate level"
 CHECK_INTERVAL = 600  # 10 minutes
 DATABASE_PATH = "jobs.db"
 MAX_JOBS_PER_SEARCH = 10
+MAX_PAGES_PER_SEARCH = 3
 CLEAR_OLD_JOBS_AFTER_DAYS = 30
+RETENTION_INTERVAL = 3600
+RETENTION_BATCH_SIZE = 500
+JOBS_ARCHIVE_DIR = None
+
+
+# ============================================
+# JOB FILTERS
+# ============================================
+# Keyword rules applied to new jobs before they are sent.
+# '*' applies to every search term; per-term entries are added on top.
+#   include_title / include_company  - at least one keyword must match
+#   require_title / require_company  - all keywords must match
+#   exclude_title / exclude_company  - none of the keywords may match
+# Keywords match whole words, case-insensitively.
+JOB_FILTERS = {
+    '*': {
+        'exclude_title': ['Senior', 'Sr.', 'Lead', 'Manager', 'Principal', 'Staff', 'Architect'],
+        'exclude_company': [],
+    },
+    # 'Cloud Engineer': {
+    #     'include_title': ['AWS', 'Azure', 'GCP'],
+    # },
+}
+
+JOB_RANKING = {
+    'keywords': {},
+    'companies': {},
+    'freshness_weight': 1.0,
+    'freshness_half_life_hours': 24,
+}
+TOP_K = 10
 
 # ============================================
 # ADVANCED SETTINGS
 # ============================================
 ENABLE_NOTIFICATIONS = True
+ENABLE_JOB_ENRICHMENT = False
+ENRICHMENT_WORKERS = 4
+ENRICHMENT_WAIT = 0
+PAGE_ARCHIVE_DIR = None
+WEB_SERVER = "waitress"
+WEB_THREADS = 8
+SSE_PORT = None
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+ENABLE_TELEGRAM_COMMANDS = True
+ASYNC_BACKEND = False
+MAX_CONCURRENT_REQUESTS = 8
+LINKEDIN_REQUESTS_PER_SECOND = 0.5
+TELEGRAM_MESSAGES_PER_SECOND = 25
+PARSE_WORKERS = 0
+EGRESS_PROXIES = []
+EGRESS_SOURCE_ADDRESSES = []
+EGRESS_COOLDOWN = 300
 SEND_SCRAPE_SUMMARY = True
 RETRY_ON_ERROR = True
 MAX_RETRIES = 3
 LOG_FILE = "job_scraper.log"
 ENABLE_LOGGING = True
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_LEVEL = "INFO"
+LOG_LEVELS = {}
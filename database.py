@@ -3,8 +3,15 @@ Database Handler
 Tracks seen jobs to avoid duplicate notifications
 """
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever init_database's DDL changes; databases already at this
+# version skip the CREATE/ALTER statements entirely
+SCHEMA_VERSION = 3
 
 class JobDatabase:
     def __init__(self, db_path="jobs.db"):
@@ -17,6 +24,22 @@ class JobDatabase:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # Schema already current: one PRAGMA read instead of the DDL below
+        cursor.execute('PRAGMA user_version')
+        if cursor.fetchone()[0] == SCHEMA_VERSION:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+            )
+            self.fts_enabled = cursor.fetchone() is not None
+            conn.close()
+            return
+        
+        # Only takes effect on a new database (before any table exists); lets
+        # retention hand freed pages back with incremental_vacuum
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        # WAL lets the web server and retention task read while the bot writes
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS jobs (
                 job_id TEXT PRIMARY KEY,
@@ -28,10 +51,30 @@ class JobDatabase:
                 search_term TEXT,
                 scraped_at TEXT,
                 notified_at TEXT,
+                description TEXT,
+                posted_at TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS job_details (
+                job_id TEXT PRIMARY KEY,
+                description TEXT,
+                seniority TEXT,
+                employment_type TEXT,
+                applicants TEXT,
+                fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Older databases were created before descriptions were stored
+        self._ensure_column(cursor, 'jobs', 'description', 'TEXT')
+        self._ensure_column(cursor, 'jobs', 'posted_at', 'TEXT')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_posted_at ON jobs (posted_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS scrape_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,10 +85,90 @@ class JobDatabase:
             )
         ''')
         
+        # 0 when a search failed to fetch, so the next cycle doesn't treat
+        # this one as the point everything was seen up to
+        self._ensure_column(cursor, 'scrape_history', 'complete', 'INTEGER DEFAULT 1')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scrape_history_time ON scrape_history (scrape_time)')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                chat_id TEXT PRIMARY KEY,
+                search_terms TEXT NOT NULL,
+                locations TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        self.fts_enabled = self._init_search_index(cursor)
+        
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         conn.commit()
+        
+        # Databases created before auto_vacuum was set never shrink; convert
+        # them once, on the schema upgrade
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            logger.info("🗜️ Converting database to incremental auto-vacuum (one-time VACUUM)...")
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
         conn.close()
         
-        print("✅ Database initialized")
+        logger.info("✅ Database initialized")
+    
+    def _ensure_column(self, cursor, table, column, declaration):
+        """Add a column to an existing table if it is missing"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        columns = [row[1] for row in cursor.fetchall()]
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+    
+    def _init_search_index(self, cursor):
+        """Create the FTS5 index over jobs and the triggers that keep it current"""
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        )
+        exists = cursor.fetchone() is not None
+        
+        try:
+            # External-content table: the text lives in jobs, FTS only holds the index
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                    title, company, location, description,
+                    content='jobs', content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ Full-text search unavailable: {str(e)}")
+            return False
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+                INSERT INTO jobs_fts(rowid, title, company, location, description)
+                VALUES (new.rowid, new.title, new.company, new.location, new.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE ON jobs BEGIN
+                INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+                VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+                INSERT INTO jobs_fts(rowid, title, company, location, description)
+                VALUES (new.rowid, new.title, new.company, new.location, new.description);
+            END
+        ''')
+        
+        if not exists:
+            # Index rows that were stored before the FTS table existed
+            cursor.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+        
+        return True
     
     def is_job_seen(self, job_id):
         """Check if job has been seen before"""
@@ -67,8 +190,9 @@ class JobDatabase:
         try:
             cursor.execute('''
                 INSERT INTO jobs (job_id, title, company, location, url, 
-                                 posted_date, search_term, scraped_at, notified_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                 posted_date, search_term, scraped_at, notified_at,
+                                 description, posted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 job['job_id'],
                 job['title'],
@@ -78,7 +202,9 @@ class JobDatabase:
                 job['posted_date'],
                 job['search_term'],
                 job['scraped_at'],
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                job.get('description'),
+                job.get('posted_at')
             ))
             
             conn.commit()
@@ -88,7 +214,7 @@ class JobDatabase:
             # Job already exists
             return False
         except Exception as e:
-            print(f"❌ Error adding job to database: {str(e)}")
+            logger.error(f"❌ Error adding job to database: {str(e)}")
             return False
         finally:
             conn.close()
@@ -104,19 +230,77 @@ class JobDatabase:
         
         return new_jobs
     
-    def log_scrape(self, jobs_found, new_jobs, search_terms):
-        """Log scraping activity"""
+    def get_job_details(self, job_ids):
+        """Cached detail-page fields for the given job IDs, as {job_id: details}"""
+        if not job_ids:
+            return {}
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(job_ids))
+        cursor.execute(f'''
+            SELECT job_id, description, seniority, employment_type, applicants
+            FROM job_details WHERE job_id IN ({placeholders})
+        ''', list(job_ids))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return {
+            row['job_id']: {key: row[key] for key in row.keys() if key != 'job_id' and row[key]}
+            for row in rows
+        }
+    
+    def save_job_details(self, job_id, details):
+        """Cache detail-page fields and index the description for search"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
-            INSERT INTO scrape_history (jobs_found, new_jobs, search_terms)
-            VALUES (?, ?, ?)
-        ''', (jobs_found, new_jobs, json.dumps(search_terms)))
+            INSERT OR REPLACE INTO job_details
+                (job_id, description, seniority, employment_type, applicants)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (
+            job_id,
+            details.get('description'),
+            details.get('seniority'),
+            details.get('employment_type'),
+            details.get('applicants')
+        ))
+        
+        if details.get('description'):
+            cursor.execute('UPDATE jobs SET description = ? WHERE job_id = ?',
+                           (details['description'], job_id))
         
         conn.commit()
         conn.close()
     
+    def log_scrape(self, jobs_found, new_jobs, search_terms, complete=True):
+        """Log scraping activity; complete=False if any search failed to fetch"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO scrape_history (jobs_found, new_jobs, search_terms, complete)
+            VALUES (?, ?, ?, ?)
+        ''', (jobs_found, new_jobs, json.dumps(search_terms), int(complete)))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_last_scrape_time(self):
+        """Local time of the last cycle in which every search fetched, or None"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # scrape_time defaults to CURRENT_TIMESTAMP, which is UTC
+        cursor.execute("SELECT datetime(MAX(scrape_time), 'localtime') FROM scrape_history WHERE complete = 1")
+        result = cursor.fetchone()[0]
+        conn.close()
+        
+        return datetime.strptime(result, '%Y-%m-%d %H:%M:%S') if result else None
+    
     def get_stats(self):
         """Get database statistics"""
         conn = sqlite3.connect(self.db_path)
@@ -145,6 +329,23 @@ class JobDatabase:
             'recent_jobs': recent_jobs
         }
     
+    def get_job_times_since(self, since):
+        """Local times jobs were added after `since` (a local datetime), oldest first"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        # created_at is UTC; compare in UTC so idx_jobs_created_at is used
+        cutoff_utc = (datetime.utcnow() - (datetime.now() - since)).strftime('%Y-%m-%d %H:%M:%S')
+        cursor.execute('''
+            SELECT datetime(created_at, 'localtime') FROM jobs
+            WHERE created_at > ?
+            ORDER BY created_at
+        ''', (cutoff_utc,))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S') for row in rows]
+    
     def get_recent_jobs(self, limit=10):
         """Get most recent jobs"""
         conn = sqlite3.connect(self.db_path)
@@ -162,23 +363,203 @@ class JobDatabase:
         
         return jobs
     
-    def clear_old_jobs(self, days=30):
-        """Clear jobs older than specified days"""
+    def add_subscription(self, chat_id, search_terms, locations):
+        """Create or replace a subscriber's search terms and locations"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
-            DELETE FROM jobs 
-            WHERE datetime(created_at) < datetime('now', ? || ' days')
-        ''', (f'-{days}',))
+            INSERT INTO subscriptions (chat_id, search_terms, locations)
+            VALUES (?, ?, ?)
+            ON CONFLICT(chat_id) DO UPDATE SET
+                search_terms = excluded.search_terms,
+                locations = excluded.locations
+        ''', (str(chat_id), json.dumps(list(search_terms)), json.dumps(list(locations))))
+        
+        conn.commit()
+        conn.close()
+    
+    def remove_subscription(self, chat_id):
+        """Delete a subscriber, returns True if one was removed"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('DELETE FROM subscriptions WHERE chat_id = ?', (str(chat_id),))
+        deleted = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        
+        return deleted > 0
+    
+    def get_subscriptions(self):
+        """Get all subscribers as (chat_id, search_terms, locations)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT chat_id, search_terms, locations FROM subscriptions ORDER BY created_at')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [(chat_id, json.loads(terms), json.loads(locations))
+                for chat_id, terms, locations in rows]
+    
+    def search_jobs(self, query, limit=20, offset=0):
+        """Full-text search over stored jobs, best matches first"""
+        match = self.build_match_query(query)
+        if not match:
+            return []
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            if self.fts_enabled:
+                # bm25 weights: title matters most, then company, location, description
+                cursor.execute('''
+                    SELECT j.job_id, j.title, j.company, j.location, j.url,
+                           j.posted_date, j.search_term, j.created_at,
+                           bm25(jobs_fts, 10.0, 5.0, 2.0, 1.0) AS rank
+                    FROM jobs_fts
+                    JOIN jobs j ON j.rowid = jobs_fts.rowid
+                    WHERE jobs_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ? OFFSET ?
+                ''', (match, limit, offset))
+            else:
+                # Fallback when SQLite is built without FTS5; % and _ typed by
+                # the user match literally
+                escaped = query.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                pattern = f"%{escaped}%"
+                cursor.execute(r'''
+                    SELECT job_id, title, company, location, url,
+                           posted_date, search_term, created_at, 0 AS rank
+                    FROM jobs
+                    WHERE title LIKE ? ESCAPE '\' OR company LIKE ? ESCAPE '\'
+                       OR location LIKE ? ESCAPE '\'
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?
+                ''', (pattern, pattern, pattern, limit, offset))
+            
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def build_match_query(query):
+        """Turn free text into a safe FTS5 MATCH expression
+        
+        Every word is quoted so user input can't inject FTS syntax; a trailing
+        '*' on a word keeps prefix matching (e.g. "kube*").
+        """
+        terms = []
+        for word in query.split():
+            prefix = word.endswith('*')
+            word = word.strip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"*' if prefix else f'"{word}"')
+        return ' '.join(terms)
+    
+    @staticmethod
+    def retention_cutoff(days):
+        """created_at/scrape_time value (UTC, like CURRENT_TIMESTAMP) for `days` ago"""
+        return (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    
+    def delete_old_jobs_batch(self, cutoff, batch_size=500):
+        """Delete up to batch_size jobs created before cutoff, returns the count
+        
+        The plain created_at comparison can use idx_jobs_created_at, so each
+        batch is a short transaction.
+        """
+        rows = self.get_old_jobs_batch(cutoff, batch_size)
+        return self.delete_jobs([row['rowid'] for row in rows], [row['job_id'] for row in rows])
+    
+    def get_old_jobs_batch(self, cutoff, batch_size=500):
+        """Up to batch_size jobs created before cutoff, oldest first, as dicts with their rowid"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT rowid, * FROM jobs
+            WHERE created_at < ?
+            ORDER BY created_at
+            LIMIT ?
+        ''', (cutoff, batch_size))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+    
+    def delete_jobs(self, rowids, job_ids):
+        """Delete jobs by rowid (and their cached details) in one transaction"""
+        if not rowids:
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        try:
+            cursor.executemany('DELETE FROM jobs WHERE rowid = ?', [(rowid,) for rowid in rowids])
+            cursor.executemany('DELETE FROM job_details WHERE job_id = ?', [(job_id,) for job_id in job_ids])
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rowids)
+    
+    def prune_scrape_history_batch(self, cutoff, batch_size=500):
+        """Delete up to batch_size scrape_history rows older than cutoff"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            DELETE FROM scrape_history WHERE id IN (
+                SELECT id FROM scrape_history
+                WHERE scrape_time < ?
+                ORDER BY scrape_time
+                LIMIT ?
+            )
+        ''', (cutoff, batch_size))
         
         deleted = cursor.rowcount
         conn.commit()
         conn.close()
         
-        print(f"🗑️ Cleared {deleted} old jobs")
         return deleted
-
+    
+    def incremental_vacuum(self, pages=1000):
+        """Return up to `pages` free pages to the OS
+        
+        Only works on databases with auto_vacuum=INCREMENTAL, which
+        init_database converts older files to; returns False otherwise
+        (e.g. if that conversion's VACUUM failed).
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('PRAGMA auto_vacuum')
+            if cursor.fetchone()[0] != 2:
+                return False
+            
+            cursor.execute(f'PRAGMA incremental_vacuum({int(pages)})')
+            cursor.fetchall()
+            return True
+        finally:
+            conn.close()
+    
+    def clear_old_jobs(self, days=30, batch_size=500):
+        """Clear jobs older than specified days"""
+        cutoff = self.retention_cutoff(days)
+        deleted = 0
+        
+        while True:
+            count = self.delete_old_jobs_batch(cutoff, batch_size)
+            deleted += count
+            if count < batch_size:
+                break
+        
+        logger.info(f"🗑️ Cleared {deleted} old jobs")
+        return deleted
 
 if __name__ == "__main__":
     # Test database
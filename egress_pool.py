@@ -0,0 +1,278 @@
+"""
+Egress Pool
+Spreads LinkedIn requests over several proxies / source addresses, favouring healthy ones
+"""
+import asyncio
+import logging
+import time
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# LinkedIn answers 429, or its own 999, when an address is being throttled
+THROTTLE_STATUSES = (429, 999)
+
+
+class EgressUnavailable(Exception):
+    """Every endpoint is cooling down"""
+
+
+class SourceAddressAdapter(HTTPAdapter):
+    """Binds outgoing connections to one local IP address"""
+
+    def __init__(self, source_address, **kwargs):
+        self.source_address = (source_address, 0)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['source_address'] = self.source_address
+        super().init_poolmanager(*args, **kwargs)
+
+    def proxy_manager_for(self, *args, **kwargs):
+        kwargs['source_address'] = self.source_address
+        return super().proxy_manager_for(*args, **kwargs)
+
+
+def make_session(headers=None, proxy=None, source_address=None):
+    """requests.Session that leaves through `proxy` and/or `source_address`"""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    if proxy:
+        session.proxies = {'http': proxy, 'https': proxy}
+    if source_address:
+        adapter = SourceAddressAdapter(source_address)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
+
+
+def endpoint_name(proxy=None, source_address=None):
+    """Readable endpoint name, without any proxy credentials"""
+    if proxy:
+        parts = urlsplit(proxy)
+        name = f"{parts.scheme}://{parts.hostname}" + (f":{parts.port}" if parts.port else "")
+        return f"{name} from {source_address}" if source_address else name
+    return source_address or "direct"
+
+
+class Endpoint:
+    """One way out, with its own session, rate limit and health record
+
+    success and latency are exponentially weighted moving averages, so an
+    endpoint that starts failing loses traffic within a few requests and
+    one that recovers wins it back just as quickly.
+    """
+
+    def __init__(self, name, session, rate=0.5, capacity=1, clock=time.monotonic):
+        self.name = name
+        self.session = session
+        self.bucket = TokenBucket(rate, capacity, clock=clock)
+        self.success = 1.0
+        self.latency = None
+        self.failures = 0       # consecutive failed requests
+        self.strikes = 0        # consecutive cooldowns, doubles the next one
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+
+    def score(self):
+        """Higher is healthier: success rate over latency, shared by in-flight requests"""
+        return self.success / (1.0 + (self.latency or 0.0)) / (1 + self.in_flight)
+
+    def snapshot(self, now):
+        return {
+            'name': self.name,
+            'requests': self.requests,
+            'success': round(self.success, 3),
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'in_flight': self.in_flight,
+            'cooling_for': max(0, round(self.cooldown_until - now)),
+        }
+
+
+class EgressPool:
+    """Picks the healthiest endpoint with spare rate budget for each request
+
+    An endpoint is put in cooldown when LinkedIn throttles it, or after
+    max_failures failed requests in a row; each further cooldown in a row
+    is twice as long (up to 16x). A throttled or failed request is retried
+    up to `retries` times while another endpoint is available; if every
+    endpoint is cooling down, requests raise EgressUnavailable instead of
+    waiting.
+
+    endpoints and clock can be injected, e.g. sessions pointed at local
+    proxy stand-ins (see benchmarks/bench_egress.py).
+    """
+
+    def __init__(self, endpoints, cooldown=300, max_failures=3, retries=1, alpha=0.3, clock=time.monotonic):
+        if not endpoints:
+            raise ValueError("EgressPool needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.cooldown = cooldown
+        self.max_failures = max_failures
+        self.retries = retries
+        self.alpha = alpha
+        self.clock = clock
+        self.lock = Lock()
+
+    @classmethod
+    def from_settings(cls, proxies=(), source_addresses=(), headers=None, rate=0.5, cooldown=300,
+                      clock=time.monotonic):
+        """One endpoint per proxy and per source address (direct if neither)"""
+        pairs = [(proxy, None) for proxy in proxies or ()]
+        pairs += [(None, address) for address in source_addresses or ()]
+        endpoints = [
+            Endpoint(endpoint_name(proxy, address), make_session(headers, proxy, address), rate, clock=clock)
+            for proxy, address in pairs or [(None, None)]
+        ]
+        return cls(endpoints, cooldown=cooldown, clock=clock)
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def _pick(self, exclude=()):
+        """Choose an endpoint and reserve one token; returns (endpoint, wait seconds)
+
+        Endpoints in exclude (e.g. the one a retry just failed on) are skipped.
+        """
+        with self.lock:
+            now = self.clock()
+            ready = [e for e in self.endpoints if e.cooldown_until <= now and e not in exclude]
+            if not ready:
+                cooling = [e.cooldown_until for e in self.endpoints if e.cooldown_until > now]
+                soonest = f" (next in {min(cooling) - now:.0f}s)" if cooling else ""
+                raise EgressUnavailable(f"no egress endpoint available, {len(cooling)} of "
+                                        f"{len(self.endpoints)} cooling down{soonest}")
+
+            # Healthiest endpoint with a token now, else the one that has one soonest
+            with_budget = [e for e in ready if e.bucket.available() >= 1]
+            if with_budget:
+                endpoint = max(with_budget, key=Endpoint.score)
+            else:
+                endpoint = max(ready, key=lambda e: (e.bucket.available(), e.score()))
+
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint, endpoint.bucket.reserve()
+
+    def record(self, endpoint, status=None, latency=None):
+        """Update an endpoint's health; status None means the request raised"""
+        throttled = status in THROTTLE_STATUSES
+        ok = status is not None and not throttled and status < 500
+        a = self.alpha
+
+        with self.lock:
+            endpoint.in_flight -= 1
+            endpoint.success = (1 - a) * endpoint.success + a * (1.0 if ok else 0.0)
+            if ok:
+                if latency is not None:
+                    endpoint.latency = latency if endpoint.latency is None else (1 - a) * endpoint.latency + a * latency
+                endpoint.failures = 0
+                endpoint.strikes = 0
+                return
+
+            endpoint.failures += 1
+            now = self.clock()
+            # Requests sent before the cooldown began don't extend it
+            if endpoint.cooldown_until > now:
+                return
+            if not throttled and endpoint.failures < self.max_failures:
+                return
+            seconds = self.cooldown * 2 ** min(endpoint.strikes, 4)
+            endpoint.cooldown_until = now + seconds
+            endpoint.strikes += 1
+            endpoint.failures = 0
+
+        reason = f"status {status}" if status is not None else f"{self.max_failures} failed requests"
+        logger.warning(f"🧊 Egress {endpoint.name} cooling down for {seconds:.0f}s after {reason}")
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the best endpoint (blocks for its rate limit)
+
+        A retry goes to a different endpoint than the ones that already failed.
+        """
+        tried = []
+        for attempt in range(self.retries + 1):
+            endpoint, delay = self._pick_retry(tried)
+            if endpoint is None:
+                break
+            if delay:
+                time.sleep(delay)
+            outcome = self._send(endpoint, method, url, **kwargs)
+            if not self._should_retry(outcome):
+                break
+            tried.append(endpoint)
+        return self._result(outcome)
+
+    async def request_async(self, method, url, limit=None, **kwargs):
+        """request() for the asyncio backend; waits on the loop, sends on a thread
+
+        limit is an optional async context manager (e.g. a Semaphore) held
+        only while sending, not while waiting for an endpoint's token.
+        """
+        tried = []
+        for attempt in range(self.retries + 1):
+            endpoint, delay = self._pick_retry(tried)
+            if endpoint is None:
+                break
+            if delay:
+                await asyncio.sleep(delay)
+            if limit is None:
+                outcome = await asyncio.to_thread(self._send, endpoint, method, url, **kwargs)
+            else:
+                async with limit:
+                    outcome = await asyncio.to_thread(self._send, endpoint, method, url, **kwargs)
+            if not self._should_retry(outcome):
+                break
+            tried.append(endpoint)
+        return self._result(outcome)
+
+    def _pick_retry(self, tried):
+        """_pick() avoiding endpoints already tried; a retry finding none gives up quietly"""
+        try:
+            return self._pick(exclude=tried)
+        except EgressUnavailable:
+            if not tried:
+                raise
+            return None, 0
+
+    def _send(self, endpoint, method, url, **kwargs):
+        """Returns the response, or the exception the request raised"""
+        started = time.perf_counter()
+        try:
+            response = endpoint.session.request(method, url, **kwargs)
+        except Exception as e:
+            self.record(endpoint)
+            return e
+        self.record(endpoint, response.status_code, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _should_retry(outcome):
+        return isinstance(outcome, Exception) or outcome.status_code in THROTTLE_STATUSES
+
+    @staticmethod
+    def _result(outcome):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def snapshot(self):
+        """Per-endpoint health, for metrics and the status page"""
+        now = self.clock()
+        with self.lock:
+            return [endpoint.snapshot(now) for endpoint in self.endpoints]
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.session.close()
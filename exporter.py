@@ -0,0 +1,165 @@
+"""
+Exporter
+Streams the jobs and scrape_history tables as CSV, JSON lines or Parquet
+"""
+import csv
+import io
+import json
+import sqlite3
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Exportable tables: time column used for --since/--until, and (name, type) columns
+EXPORT_TABLES = {
+    'jobs': ('created_at', [
+        ('job_id', 'string'), ('title', 'string'), ('company', 'string'),
+        ('location', 'string'), ('url', 'string'), ('posted_date', 'string'),
+        ('posted_at', 'string'), ('search_term', 'string'), ('scraped_at', 'string'),
+        ('notified_at', 'string'), ('description', 'string'), ('created_at', 'string'),
+    ]),
+    'scrape_history': ('scrape_time', [
+        ('id', 'int64'), ('scrape_time', 'string'), ('jobs_found', 'int64'),
+        ('new_jobs', 'int64'), ('search_terms', 'string'),
+    ]),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Rows fetched from SQLite (and written as one Parquet row group) at a time
+CHUNK_SIZE = 5000
+
+
+def iter_rows(db_path, table, since=None, until=None, search_term=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of row tuples, chunk_size at a time
+
+    The cursor steps through the table as chunks are requested, so only one
+    chunk is ever held in memory. since/until compare against the table's
+    UTC timestamp column ('2024-01-31' or '2024-01-31 18:00:00').
+    """
+    time_column, columns = EXPORT_TABLES[table]
+    conditions, params = [], []
+
+    if since:
+        conditions.append(f'{time_column} >= ?')
+        params.append(since)
+    if until:
+        conditions.append(f'{time_column} < ?')
+        params.append(until)
+    if search_term:
+        if table == 'jobs':
+            conditions.append('search_term = ?')
+        else:
+            # search_terms holds a JSON list of every term in that scrape
+            conditions.append('EXISTS (SELECT 1 FROM json_each(search_terms) WHERE value = ?)')
+        params.append(search_term)
+
+    query = f"SELECT {', '.join(name for name, _ in columns)} FROM {table}"
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += f' ORDER BY {time_column}'
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def stream_csv(table, chunks):
+    """Yield CSV text, header first"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_TABLES[table][1]])
+
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_jsonl(table, chunks):
+    """Yield one JSON object per line"""
+    names = [name for name, _ in EXPORT_TABLES[table][1]]
+    for rows in chunks:
+        yield ''.join(json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n' for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_parquet(table, chunks):
+    """Yield a Parquet file, one row group per chunk"""
+    columns = EXPORT_TABLES[table][1]
+    schema = pyarrow.schema([(name, getattr(pyarrow, kind)()) for name, kind in columns])
+
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in chunks:
+            # Transpose the chunk into columns
+            arrays = [pyarrow.array(values, type=field.type)
+                      for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+
+    yield sink.take()
+
+
+def export(db_path, table, fmt, since=None, until=None, search_term=None):
+    """Return a generator of str (csv/jsonl) or bytes (parquet) pieces"""
+    # Checked up front: the generators below only run once iterated
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table '{table}', expected one of: {', '.join(EXPORT_TABLES)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ValueError("Parquet export needs the pyarrow package (pip install pyarrow)")
+
+    chunks = iter_rows(db_path, table, since, until, search_term)
+    if fmt == 'csv':
+        return stream_csv(table, chunks)
+    if fmt == 'jsonl':
+        return stream_jsonl(table, chunks)
+    return stream_parquet(table, chunks)
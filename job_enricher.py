@@ -0,0 +1,187 @@
+"""
+Job Enricher
+Fetches job detail pages (description, seniority, ...) for new jobs
+"""
+import logging
+import queue
+import time
+from threading import Thread, Condition, Lock
+
+import requests
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Fields copied from a detail page onto the job dict
+DETAIL_FIELDS = ('description', 'seniority', 'employment_type', 'applicants')
+
+
+class EnrichmentBatch:
+    """Tracks one enrich() call so the caller can wait for its jobs"""
+
+    def __init__(self, job_ids):
+        self.remaining = set(job_ids)
+        self.results = {}
+        self.condition = Condition()
+
+    def complete(self, job_id, details):
+        with self.condition:
+            if details:
+                self.results[job_id] = details
+            self.remaining.discard(job_id)
+            self.condition.notify_all()
+
+    def wait(self, timeout):
+        """Wait until every job finished or timeout passed
+
+        Returns the results so far and the IDs still being fetched.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.remaining:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self.condition.wait(left)
+            return dict(self.results), set(self.remaining)
+
+
+class JobEnricher:
+    """Bounded worker pool that fetches each job's detail page once
+
+    Details are cached in the job_details table, so a job is only ever
+    fetched once. enrich() waits at most `wait` seconds (by default not at
+    all); anything still in flight keeps going in the background and lands
+    in the cache, where the caller can pick it up later.
+    """
+
+    def __init__(self, db, workers=4, queue_size=100, headers=None, timeout=15, rate_limiter=None):
+        self.db = db
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        # Optional EgressPool shared with the scraper, used instead of session
+        self.egress = None
+        # TokenBucket paid before each direct fetch, as detail pages leave
+        # from the same address as the searches
+        self.rate_limiter = rate_limiter
+
+        # Job IDs queued or being fetched, so repeats aren't fetched twice
+        self.pending = {}
+        self.pending_lock = Lock()
+
+        self.workers = [
+            Thread(target=self._worker, name=f"enricher-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def enrich(self, jobs, wait=0):
+        """Add detail fields to jobs in place
+
+        Returns (how many were enriched, IDs of the jobs still loading).
+        """
+        if not jobs:
+            return 0, []
+
+        cached = self.db.get_job_details([job['job_id'] for job in jobs])
+        to_fetch = [job for job in jobs if job['job_id'] not in cached and job['url'] != "N/A"]
+
+        batch = EnrichmentBatch(job['job_id'] for job in to_fetch)
+        for job in to_fetch:
+            if not self._submit(job, batch):
+                batch.complete(job['job_id'], None)
+
+        fetched, remaining = batch.wait(wait) if to_fetch else ({}, set())
+        loading = [job['job_id'] for job in to_fetch if job['job_id'] in remaining]
+        if loading:
+            logger.info(f"⏳ {len(loading)} job detail(s) still loading, sending without them")
+
+        enriched = 0
+        for job in jobs:
+            details = cached.get(job['job_id']) or fetched.get(job['job_id'])
+            if details:
+                job.update(details)
+                enriched += 1
+
+        return enriched, loading
+
+    def loading(self, job_ids):
+        """The given job IDs whose detail pages are queued or being fetched"""
+        with self.pending_lock:
+            return {job_id for job_id in job_ids if job_id in self.pending}
+
+    def _submit(self, job, batch):
+        """Queue a job for fetching without blocking; False if it can't be queued"""
+        job_id = job['job_id']
+        with self.pending_lock:
+            if job_id in self.pending:
+                # Already in flight from an earlier cycle: just listen for it
+                self.pending[job_id].append(batch)
+                return True
+            try:
+                self.queue.put_nowait((job_id, job['url']))
+            except queue.Full:
+                logger.warning(f"⚠️ Enrichment queue full, skipping details for {job_id}")
+                return False
+            self.pending[job_id] = [batch]
+            return True
+
+    def _worker(self):
+        while True:
+            job_id, url = self.queue.get()
+            details = None
+            try:
+                # The egress pool has its own per-endpoint budgets
+                if self.rate_limiter and not self.egress:
+                    self.rate_limiter.acquire()
+                details = self.fetch_details(url)
+                if details:
+                    self.db.save_job_details(job_id, details)
+            except Exception as e:
+                logger.warning(f"⚠️ Error fetching details for {job_id}: {str(e)}")
+            finally:
+                with self.pending_lock:
+                    batches = self.pending.pop(job_id, [])
+                for batch in batches:
+                    batch.complete(job_id, details)
+                self.queue.task_done()
+
+    def fetch_details(self, url):
+        """Download and parse one job detail page"""
+        response = (self.egress or self.session).get(url, timeout=self.timeout)
+        if response.status_code != 200:
+            logger.warning(f"⚠️ Status code {response.status_code} for job details")
+            return None
+        return self.parse_job_details(response.text)
+
+    def parse_job_details(self, html_content):
+        """Extract description, criteria and applicant count from a detail page"""
+        soup = BeautifulSoup(html_content, 'html.parser')
+        details = {}
+
+        description_elem = (soup.find('div', class_='show-more-less-html__markup')
+                            or soup.find('div', class_='description__text'))
+        if description_elem:
+            details['description'] = description_elem.get_text('\n', strip=True)
+
+        # "Seniority level", "Employment type", "Job function", "Industries"
+        for item in soup.find_all('li', class_='description__job-criteria-item'):
+            header = item.find('h3')
+            value = item.find('span')
+            if not header or not value:
+                continue
+            name = header.get_text(strip=True).lower()
+            if 'seniority' in name:
+                details['seniority'] = value.get_text(strip=True)
+            elif 'employment' in name:
+                details['employment_type'] = value.get_text(strip=True)
+
+        applicants_elem = soup.find(class_='num-applicants__caption')
+        if applicants_elem:
+            details['applicants'] = applicants_elem.get_text(strip=True)
+
+        return details or None
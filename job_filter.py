@@ -0,0 +1,198 @@
+"""
+Job Filter
+Drops unwanted jobs (e.g. Senior/Lead roles) before notifications are sent
+"""
+import re
+from collections import Counter
+
+# Rule kinds supported in a JOB_FILTERS profile, per field
+#   include_*  - at least one keyword must match (OR)
+#   require_*  - every keyword must match (AND)
+#   exclude_*  - no keyword may match (NOT)
+RULE_KINDS = ('include', 'require', 'exclude')
+FIELDS = ('title', 'company')
+
+# Profile that applies to every search term
+DEFAULT_PROFILE = '*'
+
+
+def normalize(text):
+    """Lower-case and collapse whitespace so keywords and text compare equal"""
+    return ' '.join(text.lower().split())
+
+
+def build_trie_pattern(keywords):
+    """Build one regex alternation from a keyword trie
+
+    A flat 'a|b|c' alternation retries every keyword at every position;
+    factoring shared prefixes into a trie means each character of the text
+    is examined once per branch instead of once per keyword.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        is_end = '' in node
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char != '']
+
+        if not branches:
+            return ''
+
+        if len(branches) == 1:
+            body = branches[0]
+            if is_end:
+                return f'(?:{body})?' if len(body) > 1 else f'{body}?'
+            return body
+
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if is_end else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds every keyword from a large list in a text with a single regex scan
+
+    Matches may overlap: "site reliability" and "reliability engineer" are
+    both found in "site reliability engineer", and "lead" in "team lead".
+    """
+
+    def __init__(self, keywords):
+        self.keywords = {normalize(k) for k in keywords if k and k.strip()}
+        self.pattern = None
+        self.implied = {}
+
+        if not self.keywords:
+            return
+
+        # Keywords only match as whole words (also works for "Sr." or "C++").
+        # The scan is a lookahead, so it consumes nothing and tries every
+        # word start, including ones inside an earlier match
+        self.pattern = re.compile(
+            r'(?<!\w)(?=(' + build_trie_pattern(self.keywords) + r')(?!\w))'
+        )
+
+        # Each position reports its longest keyword, so remember the shorter
+        # ones starting at the same place ("team" in "team lead", "sr" in "sr.")
+        for keyword in self.keywords:
+            self.implied[keyword] = frozenset(
+                keyword[:end] for end in range(1, len(keyword) + 1)
+                if keyword[:end] in self.keywords
+                and (end == len(keyword) or not re.match(r'\w', keyword[end]))
+            )
+
+    def find(self, text):
+        """Return the set of keywords present in text"""
+        if not self.pattern or not text:
+            return frozenset()
+
+        found = set()
+        for match in self.pattern.finditer(normalize(text)):
+            found |= self.implied[match.group(1)]
+        return found
+
+
+class FilterProfile:
+    """Compiled rules for one search term"""
+
+    def __init__(self, name, rules):
+        self.name = name
+        self.rules = {}
+        for field in FIELDS:
+            for kind in RULE_KINDS:
+                keywords = frozenset(normalize(k) for k in rules.get(f'{kind}_{field}', []) if k.strip())
+                if keywords:
+                    self.rules[(kind, field)] = keywords
+
+    def merged_with(self, other):
+        """Combine two profiles; both sets of rules must pass"""
+        merged = FilterProfile(other.name, {})
+        for key in set(self.rules) | set(other.rules):
+            merged.rules[key] = self.rules.get(key, frozenset()) | other.rules.get(key, frozenset())
+        return merged
+
+    def keywords(self, field):
+        """All keywords this profile uses for a field"""
+        return set().union(*(words for (kind, f), words in self.rules.items() if f == field))
+
+    def check(self, matches):
+        """Return the name of the first rule the job fails, or None if it passes
+
+        matches maps each field to the set of keywords found in it.
+        """
+        for (kind, field), keywords in self.rules.items():
+            found = matches[field]
+            if kind == 'exclude':
+                hit = found & keywords
+                if hit:
+                    return f"{self.name}: exclude_{field} '{min(hit)}'"
+            elif kind == 'include':
+                if not found & keywords:
+                    return f"{self.name}: include_{field}"
+            elif kind == 'require':
+                if not keywords <= found:
+                    return f"{self.name}: require_{field}"
+        return None
+
+
+class JobFilter:
+    """Applies JOB_FILTERS to scraped jobs
+
+    All keywords from every profile are compiled into one matcher per field,
+    so each job costs one scan of its title and company regardless of how
+    many rules are configured. Rules are then evaluated as set operations
+    on the (small) set of keywords that were found.
+    """
+
+    def __init__(self, filters=None):
+        filters = filters or {}
+        self.default = FilterProfile(DEFAULT_PROFILE, filters.get(DEFAULT_PROFILE, {}))
+        self.profiles = {
+            normalize(term): self.default.merged_with(FilterProfile(term, rules))
+            for term, rules in filters.items() if term != DEFAULT_PROFILE
+        }
+
+        self.matchers = {}
+        for field in FIELDS:
+            keywords = self.default.keywords(field)
+            for profile in self.profiles.values():
+                keywords |= profile.keywords(field)
+            self.matchers[field] = KeywordMatcher(keywords)
+
+        # Jobs removed per rule, since the filter was created
+        self.stats = Counter()
+
+    @property
+    def enabled(self):
+        return bool(self.default.rules) or any(p.rules for p in self.profiles.values())
+
+    def check(self, job):
+        """Return the rule that rejects job, or None if it should be sent"""
+        profile = self.profiles.get(normalize(job.get('search_term') or ''), self.default)
+        if not profile.rules:
+            return None
+
+        matches = {field: self.matchers[field].find(job.get(field)) for field in FIELDS}
+        return profile.check(matches)
+
+    def apply(self, jobs):
+        """Split jobs into (kept, removed_per_rule) for this batch"""
+        if not self.enabled:
+            return list(jobs), Counter()
+
+        kept = []
+        removed = Counter()
+        for job in jobs:
+            rule = self.check(job)
+            if rule:
+                removed[rule] += 1
+            else:
+                kept.append(job)
+
+        self.stats.update(removed)
+        return kept, removed
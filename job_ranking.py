@@ -0,0 +1,129 @@
+"""
+Job Ranking
+Scores new jobs so only the best few are pushed each cycle; the rest go into a digest
+"""
+import heapq
+from datetime import datetime
+
+from job_filter import KeywordMatcher, normalize
+
+# Defaults for the JOB_RANKING setting
+DEFAULT_RANKING = {
+    'keywords': {},            # keyword -> weight, matched in title and description
+    'companies': {},           # company keyword -> weight (negative to push down)
+    'freshness_weight': 1.0,   # score of a job posted just now
+    'freshness_half_life_hours': 24,
+    'click_weight': 1.0,       # multiplied by the click-through rate, when known
+}
+
+
+class JobRanker:
+    """Scores a batch of jobs and splits it into the top K and the rest
+
+    Scoring works column by column over the whole batch: one keyword scan
+    per text column, one pass for freshness, one for company weights. Then
+    heapq picks the top K in O(n log K) instead of sorting everything.
+
+    click_rates is an optional {normalized company or search term: rate in
+    0..1}; nothing records clicks yet, so by default it has no effect.
+    """
+
+    def __init__(self, ranking=None, click_rates=None):
+        settings = dict(DEFAULT_RANKING, **(ranking or {}))
+        self.keyword_weights = {normalize(k): float(w) for k, w in settings['keywords'].items()}
+        self.company_weights = {normalize(k): float(w) for k, w in settings['companies'].items()}
+        self.freshness_weight = float(settings['freshness_weight'])
+        self.half_life = float(settings['freshness_half_life_hours']) * 3600
+        self.click_weight = float(settings['click_weight'])
+        self.click_rates = click_rates or {}
+
+        self.keyword_matcher = KeywordMatcher(self.keyword_weights)
+        self.company_matcher = KeywordMatcher(self.company_weights)
+
+    def keyword_scores(self, jobs):
+        """Sum of keyword weights found in each job's title/description"""
+        scores = []
+        for job in jobs:
+            text = f"{job.get('title') or ''} {job.get('description') or ''}"
+            scores.append(sum(self.keyword_weights[k] for k in self.keyword_matcher.find(text)))
+        return scores
+
+    def company_scores(self, jobs):
+        return [
+            sum(self.company_weights[k] for k in self.company_matcher.find(job.get('company')))
+            for job in jobs
+        ]
+
+    def freshness_scores(self, jobs, now=None):
+        """freshness_weight halved for every half-life since posting"""
+        now = now or datetime.now()
+        scores = []
+        for job in jobs:
+            try:
+                age = (now - datetime.strptime(job.get('posted_at') or '', '%Y-%m-%d %H:%M:%S')).total_seconds()
+            except ValueError:
+                scores.append(0.0)
+                continue
+            scores.append(self.freshness_weight * 0.5 ** (max(age, 0) / self.half_life))
+        return scores
+
+    def click_scores(self, jobs):
+        if not self.click_rates:
+            return [0.0] * len(jobs)
+        return [
+            self.click_weight * max(
+                self.click_rates.get(normalize(job.get('company') or ''), 0.0),
+                self.click_rates.get(normalize(job.get('search_term') or ''), 0.0)
+            )
+            for job in jobs
+        ]
+
+    def score(self, jobs, now=None):
+        """Score every job in the batch; also stored as job['score']"""
+        columns = (
+            self.keyword_scores(jobs),
+            self.company_scores(jobs),
+            self.freshness_scores(jobs, now),
+            self.click_scores(jobs),
+        )
+        scores = [sum(values) for values in zip(*columns)]
+        for job, score in zip(jobs, scores):
+            job['score'] = round(score, 3)
+        return scores
+
+    def rank(self, jobs, k=None, now=None):
+        """Return (top, rest): the k best jobs and the others, both best first
+
+        With k=None every job is in top. Ties keep scrape order.
+        """
+        jobs = list(jobs)
+        scores = self.score(jobs, now)
+        order = range(len(jobs))
+        key = lambda i: (scores[i], -i)
+
+        if k is None or k >= len(jobs):
+            return [jobs[i] for i in sorted(order, key=key, reverse=True)], []
+
+        best = heapq.nlargest(k, order, key=key)
+        chosen = set(best)
+        rest = sorted((i for i in order if i not in chosen), key=key, reverse=True)
+        return [jobs[i] for i in best], [jobs[i] for i in rest]
+
+
+def split_top_k(jobs, k):
+    """Split scored jobs into (k best, rest)
+
+    The k best come first by job['score'] (ties keep the given order) and
+    are picked with heapq in O(n log k); the rest keep the given order.
+    k=None puts every job in the first list, best first.
+    """
+    jobs = list(jobs)
+    order = range(len(jobs))
+    key = lambda i: (jobs[i].get('score') or 0, -i)
+
+    if k is None or k >= len(jobs):
+        return [jobs[i] for i in sorted(order, key=key, reverse=True)], []
+
+    best = heapq.nlargest(k, order, key=key)
+    chosen = set(best)
+    return [jobs[i] for i in best], [jobs[i] for i in order if i not in chosen]
@@ -2,9 +2,16 @@
 Keep-alive web server for Replit
 This keeps the deployment active by running Flask on main thread
 """
-from flask import Flask
-from threading import Thread
+from flask import Flask, Response, request
+from threading import Lock
+import hashlib
+import hmac
+import html
+import logging
 import os
+from live_feed import LiveFeed, SSEServer, format_event, RETRY_MS
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
@@ -12,16 +19,32 @@ app = Flask(__name__)
 bot_status = {
     "running": True,
     "last_check": "Starting...",
-    "jobs_found": 0
+    "jobs_found": 0,
+    "search_terms": [],
+    "location": "",
+    "check_interval": 0,
+    "subscribers": 0,
+    "experience_level": ""
 }
 
-@app.route('/')
-def home():
-    return f"""
+# The running BotEngine (for /profile), set by create_bot_engine()
+running_engine = None
+
+# Recent jobs/cycle summaries for /events and the SSE server
+live_feed = LiveFeed()
+sse_server = None
+
+# Bumped on every status change; the page is only re-rendered when it moves
+status_version = 0
+status_lock = Lock()
+
+# Last rendered status page: (version, body, etag)
+_page_cache = (-1, "", "")
+
+PAGE_TEMPLATE = """
     <html>
         <head>
             <title>LinkedIn Job Bot</title>
-            <meta http-equiv="refresh" content="30">
             <style>
                 body {{
                     font-family: Arial, sans-serif;
@@ -43,6 +66,7 @@ def home():
                     border-radius: 5px;
                     margin: 20px 0;
                 }}
+                #feed li {{ margin: 6px 0; }}
             </style>
         </head>
         <body>
@@ -51,131 +75,300 @@ def home():
                 <div class="status">
                     ✅ <strong>Status:</strong> Bot is running!
                 </div>
-                <p><strong>Monitoring:</strong> DevOps Engineer, Cloud Engineer</p>
-                <p><strong>Location:</strong> India</p>
-                <p><strong>Check Interval:</strong> Every 10 minutes</p>
-                <p><strong>Experience Level:</strong> Entry level & Associate level</p>
-                <p><strong>Last Check:</strong> {bot_status['last_check']}</p>
-                <p><strong>Jobs Found:</strong> {bot_status['jobs_found']}</p>
+                <p><strong>Monitoring:</strong> {search_terms}</p>
+                <p><strong>Location:</strong> {location}</p>
+                <p><strong>Check Interval:</strong> Every {interval_minutes:g} minutes</p>
+                <p><strong>Experience Level:</strong> {experience_level}</p>
+                <p><strong>Subscribers:</strong> {subscribers}</p>
+                <p><strong>Last Check:</strong> <span id="last-check">{last_check}</span></p>
+                <p><strong>Jobs Found:</strong> <span id="jobs-found">{jobs_found}</span></p>
                 <hr>
                 <p>Your bot is actively monitoring LinkedIn for new job postings.</p>
                 <p>You'll receive Telegram notifications when new jobs are found!</p>
-                <p><small>Page auto-refreshes every 30 seconds</small></p>
+                <h3>Live feed</h3>
+                <ul id="feed"></ul>
+                <p><small>New jobs appear here as they are found</small></p>
             </div>
+            <script>
+                var port = {feed_port};
+                var url = port ? location.protocol + '//' + location.hostname + ':' + port + '/events' : '/events';
+                var source = new EventSource(url);
+                source.addEventListener('job', function (e) {{
+                    var job = JSON.parse(e.data);
+                    var item = document.createElement('li');
+                    var link = document.createElement('a');
+                    link.href = job.url;
+                    link.textContent = job.title + ' at ' + job.company;
+                    item.appendChild(link);
+                    item.appendChild(document.createTextNode(' - ' + job.location));
+                    var feed = document.getElementById('feed');
+                    feed.insertBefore(item, feed.firstChild);
+                }});
+                source.addEventListener('cycle', function (e) {{
+                    var cycle = JSON.parse(e.data);
+                    document.getElementById('last-check').textContent = cycle.time;
+                    document.getElementById('jobs-found').textContent = cycle.jobs_found;
+                }});
+            </script>
         </body>
     </html>
     """
 
+def render_status_page():
+    """Return (body, etag) for the current status, rendering only after changes"""
+    global _page_cache
+    
+    version, body, etag = _page_cache
+    if version == status_version:
+        return body, etag
+    
+    with status_lock:
+        version = status_version
+        snapshot = dict(bot_status)
+    
+    body = PAGE_TEMPLATE.format(
+        search_terms=html.escape(', '.join(snapshot['search_terms']) or '-'),
+        location=html.escape(snapshot['location'] or '-'),
+        interval_minutes=snapshot['check_interval'] / 60,
+        experience_level=html.escape(snapshot['experience_level'] or '-'),
+        subscribers=snapshot['subscribers'],
+        last_check=html.escape(str(snapshot['last_check'])),
+        jobs_found=snapshot['jobs_found'],
+        # Same-origin /events when the feed server fronts the app
+        feed_port=sse_server.port if sse_server and not sse_server.backend else 0
+    )
+    etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+    
+    # Single tuple assignment so readers never see a half-updated cache
+    _page_cache = (version, body, etag)
+    return body, etag
+
+@app.route('/')
+def home():
+    body, etag = render_status_page()
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='text/html')
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/events')
+def events():
+    """Buffered live-feed events since Last-Event-ID, as text/event-stream
+    
+    The response ends right away and EventSource reconnects after
+    RETRY_MS, so no worker thread is held per watcher. Normally the
+    asyncio server in front of the app answers /events with a live stream
+    and requests never get here; this is the fallback when the app is
+    reached directly.
+    """
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+    
+    body = f"retry: {RETRY_MS}\n\n" + ''.join(
+        format_event(event_id, event, data) for event_id, event, data in live_feed.since(last_id)
+    )
+    response = Response(body, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/health')
 def health():
     return {"status": "running", "bot": "active"}, 200
 
-def update_status(last_check, jobs_found):
-    """Update bot status for display"""
-    bot_status['last_check'] = last_check
-    bot_status['jobs_found'] = jobs_found
-
-def run_flask():
-    """Run Flask server on main thread"""
-    port = int(os.environ.get('PORT', 8080))
-    print(f"🌐 Starting web server on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False)
+@app.route('/profile', methods=['POST'])
+def profile():
+    """Profile the next N cycles, e.g.
+    curl -X POST -H 'X-Profile-Token: <PROFILE_TOKEN>' '/profile?cycles=2'
+    """
+    from config_loader import get_config
+    token = getattr(get_config(), 'PROFILE_TOKEN', None)
+    if not token:
+        return {"error": "profiling over HTTP is disabled (set PROFILE_TOKEN)"}, 404
+    if not hmac.compare_digest(request.headers.get('X-Profile-Token', '').encode(), str(token).encode()):
+        return {"error": "missing or wrong X-Profile-Token"}, 403
+    
+    if running_engine is None:
+        return {"error": "bot is not running"}, 503
+    
+    try:
+        cycles = min(max(int(request.args.get('cycles', 1)), 1), 10)
+    except ValueError:
+        return {"error": "'cycles' must be an integer"}, 400
+    
+    pending = running_engine.profiler.request(cycles)
+    return {"pending_cycles": pending, "output_dir": running_engine.profiler.output_dir,
+            "last_outputs": running_engine.profiler.last_outputs}, 202
 
-def run_bot_in_background():
-    """Run the bot in a background thread"""
-    import time
-    from datetime import datetime
+@app.route('/search')
+def search():
+    """Ranked full-text search over scraped jobs, e.g. /search?q=kubernetes"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return {"error": "missing query parameter 'q'"}, 400
     
-    # Import here to avoid circular imports
-    from linkedin_scraper import LinkedInJobScraper
-    from telegram_notifier import TelegramNotifier
-    from database import JobDatabase
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return {"error": "'limit' and 'offset' must be integers"}, 400
+    
+    results = get_database().search_jobs(query, limit=limit, offset=offset)
+    return {"query": query, "count": len(results), "results": results}, 200
+
+@app.route('/export/<table>')
+def export_table(table):
+    """Stream a table, e.g. /export/jobs?format=jsonl&since=2024-01-01&term=DevOps%20Engineer"""
+    from exporter import export, EXPORT_FORMATS
     
+    fmt = request.args.get('format', 'csv')
     try:
-        import config_render as config
-    except ImportError:
-        import config
-    
-    print("🤖 Starting LinkedIn Job Bot in background...")
-    
-    scraper = LinkedInJobScraper()
-    db = JobDatabase(config.DATABASE_PATH)
-    
-    # Initialize Telegram notifier
-    if config.TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN_HERE":
-        notifier = TelegramNotifier(config.TELEGRAM_BOT_TOKEN, config.TELEGRAM_CHAT_ID)
-        
-        # Test connection and send startup message
-        if notifier.test_connection():
-            startup_msg = "✅ <b>LinkedIn Job Bot Started on Replit!</b>\n\n"
-            startup_msg += f"🔍 Monitoring: {', '.join(config.JOB_TITLES)}\n"
-            startup_msg += f"📍 Location: {config.LOCATION}\n"
-            startup_msg += f"⏰ Check interval: {config.CHECK_INTERVAL/60} minutes"
-            notifier.send_message(startup_msg)
+        pieces = export(get_database().db_path, table, fmt,
+                        since=request.args.get('since'), until=request.args.get('until'),
+                        search_term=request.args.get('term'))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    response = Response(pieces, mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={table}.{fmt}'
+    return response
+
+_database = None
+_database_lock = Lock()
+
+def get_database():
+    """Shared JobDatabase for web requests, opened on first use"""
+    global _database
+    with _database_lock:
+        if _database is None:
+            from database import JobDatabase
+            from config_loader import get_config
+            config = get_config()
+            _database = JobDatabase(config.DATABASE_PATH)
+    return _database
+
+def update_status(last_check=None, jobs_found=None, **fields):
+    """Update bot status for display"""
+    global status_version
+    
+    with status_lock:
+        if last_check is not None:
+            bot_status['last_check'] = last_check
+        if jobs_found is not None:
+            bot_status['jobs_found'] = jobs_found
+        bot_status.update(fields)
+        status_version += 1
+
+def run_flask(server=None, threads=None):
+    """Run the web server on the main thread
+    
+    'waitress' (the default when installed) is a production WSGI server
+    with a fixed pool of worker threads; 'threaded' falls back to Flask's
+    built-in server with one thread per request so a slow client can never
+    hold up the others.
+    
+    Without SSE_PORT the app listens on a local port only and the asyncio
+    live-feed server takes the public port: it streams /events itself,
+    one coroutine per watcher, and passes every other request through.
+    """
+    from config_loader import get_config
+    config = get_config()
+    
+    server = server or getattr(config, 'WEB_SERVER', 'waitress')
+    threads = threads or getattr(config, 'WEB_THREADS', 8)
+    port = int(os.environ.get('PORT', 8080))
+    sse_port = getattr(config, 'SSE_PORT', None)
+    
+    if sse_port:
+        start_live_feed_server(int(sse_port))
+        host, app_port = '0.0.0.0', port
     else:
-        notifier = None
-        print("⚠️ Telegram not configured")
+        host, app_port = '127.0.0.1', 0
     
-    # Main bot loop
-    iteration = 0
-    while True:
+    web = None
+    if server == 'waitress':
         try:
-            iteration += 1
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"\n{'='*70}")
-            print(f"🔄 Iteration #{iteration} - {now}")
-            print(f"{'='*70}")
-            
-            # Scrape jobs
-            jobs = scraper.scrape_jobs(config.JOB_TITLES, config.LOCATION)
-            print(f"📊 Found {len(jobs)} total jobs")
-            
-            # Filter new jobs
-            new_jobs = db.get_new_jobs(jobs)
-            print(f"✨ {len(new_jobs)} new jobs")
-            
-            # Update status for web display
-            update_status(now, len(jobs))
-            
-            # Log scraping activity
-            db.log_scrape(len(jobs), len(new_jobs), config.JOB_TITLES)
-            
-            # Send notifications
-            if new_jobs and notifier:
-                print(f"📱 Sending {len(new_jobs)} notification(s)...")
-                notifier.send_multiple_jobs(new_jobs)
-                print("✅ Notifications sent!")
-            elif new_jobs:
-                print(f"📋 {len(new_jobs)} new jobs found (notifications disabled)")
-            else:
-                print("😴 No new jobs found")
-            
-            # Show stats
-            stats = db.get_stats()
-            print(f"\n📈 Database Stats:")
-            print(f"   Total jobs tracked: {stats['total_jobs']}")
-            print(f"   Jobs in last 24h: {stats['recent_jobs']}")
-            
-            # Wait for next iteration
-            print(f"\n⏳ Waiting {config.CHECK_INTERVAL} seconds until next check...")
-            time.sleep(config.CHECK_INTERVAL)
-            
-        except Exception as e:
-            print(f"❌ Error in bot loop: {str(e)}")
-            if notifier:
-                error_msg = f"⚠️ <b>Bot Error</b>\n\n{str(e)}"
-                notifier.send_message(error_msg)
-            time.sleep(60)  # Wait 1 minute before retrying
-
-def start_replit_bot():
-    """Start bot in background thread, Flask on main thread"""
-    print("🚀 Starting Replit bot with keep-alive server...")
+            from waitress import create_server
+        except ImportError:
+            logger.warning("⚠️ waitress not installed, using Flask's threaded server")
+        else:
+            web = create_server(app, host=host, port=app_port, threads=threads)
+            app_port = web.effective_port
+            serve = web.run
+            logger.info(f"🌐 Starting waitress web server on port {app_port} ({threads} threads)")
+    if web is None:
+        from werkzeug.serving import make_server
+        web = make_server(host, app_port, app, threaded=True)
+        app_port = web.server_port
+        serve = web.serve_forever
+        logger.info(f"🌐 Starting web server on port {app_port}")
+    
+    if not sse_port:
+        start_live_feed_server(port, backend=('127.0.0.1', app_port))
+    serve()
+
+def create_bot_engine():
+    """BotEngine wired to the status page and the live feed"""
+    # Import here to avoid circular imports
+    from bot_engine import BotEngine
+    from config_loader import get_config
+    config = get_config()
+    
+    global running_engine
+    engine = running_engine = BotEngine(config)
+    
+    def show_config(*args):
+        # Show the real configuration on the status page
+        update_status(
+            search_terms=engine.router.search_terms,
+            location=config.LOCATION,
+            check_interval=config.CHECK_INTERVAL,
+            subscribers=len(engine.router.index),
+            experience_level=getattr(config, 'EXPERIENCE_LEVEL', '')
+        )
+    
+    def cycle_finished(summary):
+        # Update status for web display and push to live dashboards
+        update_status(summary['time'], summary['jobs_found'], search_terms=engine.router.search_terms,
+                      subscribers=len(engine.router.index))
+        live_feed.publish_cycle(time=summary['time'], iteration=summary['iteration'],
+                                jobs_found=summary['jobs_found'], new_jobs=summary['new_jobs'])
+    
+    show_config()
+    engine.add_hook('cycle_start', show_config)
+    engine.add_hook('job', live_feed.publish_job)
+    engine.add_hook('cycle_end', cycle_finished)
+    return engine
+
+def start_live_feed_server(port, backend=None):
+    """Stream the live feed from an asyncio server, in front of the app if backend is given"""
+    global sse_server
+    sse_server = SSEServer(live_feed, port=port, backend=backend)
+    sse_server.start_in_thread()
+
+def start_replit_bot(profile_cycles=0):
+    """Start bot in background thread, Flask on main thread
+    
+    profile_cycles > 0 profiles the bot's first cycles (main.py --profile N).
+    """
+    from config_loader import get_config
+    from log_setup import setup_logging
+    config = get_config()
+    setup_logging(config)
+    logger.info("🚀 Starting Replit bot with keep-alive server...")
     
     # Start bot in background thread
-    bot_thread = Thread(target=run_bot_in_background)
-    bot_thread.daemon = True
-    bot_thread.start()
-    print("✅ Bot thread started")
+    from runners import ThreadRunner
+    logger.info("🤖 Starting LinkedIn Job Bot in background...")
+    engine = create_bot_engine()
+    if profile_cycles:
+        engine.profiler.request(profile_cycles)
+    ThreadRunner(engine, startup_title="LinkedIn Job Bot Started on Replit!").start()
+    logger.info("✅ Bot thread started")
     
     # Run Flask on main thread (blocks here)
     run_flask()
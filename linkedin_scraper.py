@@ -6,9 +6,33 @@ import requests
 from bs4 import BeautifulSoup
 import time
 import random
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 from urllib.parse import quote
 import json
+import logging
+
+from log_setup import log_context
+
+logger = logging.getLogger(__name__)
+
+# Results per LinkedIn search page, used to compute the 'start' offset
+PAGE_SIZE = 25
+
+# "5 minutes ago", "1 hour ago", "2 weeks ago", ...
+RELATIVE_TIME_PATTERN = re.compile(r'(\d+)\s*(second|minute|min|hour|hr|day|week|month|year)s?', re.IGNORECASE)
+
+RELATIVE_TIME_UNITS = {
+    'second': timedelta(seconds=1),
+    'minute': timedelta(minutes=1),
+    'min': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'hr': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
 
 class LinkedInJobScraper:
     def __init__(self):
@@ -22,7 +46,17 @@ class LinkedInJobScraper:
             'Upgrade-Insecure-Requests': '1'
         }
         
-    def build_search_url(self, job_title, location=""):
+        # Optional PageArchive that keeps a copy of every fetched page
+        self.archive = None
+        
+        # Optional EgressPool; without one requests leave directly
+        self.egress = None
+        
+        # Searches whose pages failed to fetch, so callers can tell a
+        # partial scrape from a complete one
+        self.failed_fetches = 0
+        
+    def build_search_url(self, job_title, location="", page=0):
         """Build LinkedIn job search URL"""
         params = {
             'keywords': job_title,
@@ -30,40 +64,90 @@ class LinkedInJobScraper:
             'f_TPR': 'r86400',  # Last 24 hours (fresh jobs only)
             'f_E': '2%2C3',  # Entry level (2) AND Associate (3) - filters for both experience levels
             'position': '1',
-            'pageNum': '0'
+            'pageNum': '0',
+            'sortBy': 'DD'  # Most recent first, so paging can stop at the last check
         }
         
+        if page:
+            params['start'] = str(page * PAGE_SIZE)
+        
         query_string = '&'.join([f"{k}={quote(str(v))}" for k, v in params.items()])
         return f"{self.base_url}?{query_string}"
     
-    def scrape_jobs(self, job_titles, location="India"):
-        """Scrape jobs for given titles"""
+    def scrape_jobs(self, job_titles, location="India", since=None, max_pages=1):
+        """Scrape jobs for given titles
+        
+        With max_pages > 1 later result pages are fetched too, stopping as
+        soon as a page reaches postings older than `since` (a datetime).
+        """
         all_jobs = []
         
         for job_title in job_titles:
-            print(f"🔍 Searching for: {job_title}")
-            url = self.build_search_url(job_title, location)
+            with log_context(search_term=job_title):
+                logger.info(f"🔍 Searching for: {job_title}")
             
-            try:
-                # Add random delay to avoid rate limiting
-                time.sleep(random.uniform(2, 5))
+                for page in range(max_pages):
+                    url = self.build_search_url(job_title, location, page)
                 
-                response = requests.get(url, headers=self.headers, timeout=15)
-                
-                if response.status_code == 200:
-                    jobs = self.parse_job_listings(response.text, job_title)
-                    all_jobs.extend(jobs)
-                    print(f"✅ Found {len(jobs)} jobs for {job_title}")
-                else:
-                    print(f"⚠️ Status code {response.status_code} for {job_title}")
+                    try:
+                        # Add random delay to avoid rate limiting; a pool of
+                        # several endpoints paces each one with its own bucket
+                        if self.egress is None or len(self.egress) == 1:
+                            time.sleep(random.uniform(2, 5))
                     
-            except Exception as e:
-                print(f"❌ Error scraping {job_title}: {str(e)}")
+                        fetch_started = time.perf_counter()
+                        if self.egress:
+                            response = self.egress.get(url, timeout=15)
+                        else:
+                            response = requests.get(url, headers=self.headers, timeout=15)
+                        fetch_ms = round((time.perf_counter() - fetch_started) * 1000)
+                    
+                        if response.status_code != 200:
+                            logger.warning(f"⚠️ Status code {response.status_code} for {job_title}")
+                            self.failed_fetches += 1
+                            break
+                    
+                        if self.archive:
+                            self.archive.append(response.text.encode('utf-8'), url, job_title, location, page)
+                    
+                        # A single page keeps the original first-10 cap; when
+                        # paginating every card is kept so pages don't leave gaps
+                        limit = 10 if max_pages == 1 else None
+                        parse_started = time.perf_counter()
+                        jobs = self.parse_job_listings(response.text, job_title, limit=limit)
+                        all_jobs.extend(jobs)
+                        logger.info(f"✅ Found {len(jobs)} jobs for {job_title}" + (f" (page {page + 1})" if page else ""),
+                                    extra={'page': page + 1, 'jobs': len(jobs), 'fetch_ms': fetch_ms,
+                                           'parse_ms': round((time.perf_counter() - parse_started) * 1000)})
+                    
+                        if not jobs or self.reached_older_jobs(jobs, since):
+                            break
+                        
+                    except Exception as e:
+                        logger.error(f"❌ Error scraping {job_title}: {str(e)}")
+                        self.failed_fetches += 1
+                        break
                 
         return all_jobs
     
-    def parse_job_listings(self, html_content, search_term):
-        """Parse job listings from HTML"""
+    def reached_older_jobs(self, jobs, since):
+        """True if any job on the page was posted before `since`
+
+        Results are requested newest first (sortBy=DD), so every later
+        page would be older still.
+        """
+        if since is None:
+            return False
+        
+        cutoff = since.strftime('%Y-%m-%d %H:%M:%S')
+        return any(job['posted_at'] < cutoff for job in jobs)
+    
+    def parse_job_listings(self, html_content, search_term, limit=10, now=None):
+        """Parse job listings from HTML
+
+        now is when the page was fetched (default: now); relative times
+        like "3 hours ago" are counted back from it.
+        """
         soup = BeautifulSoup(html_content, 'html.parser')
         jobs = []
         
@@ -74,18 +158,18 @@ class LinkedInJobScraper:
             # Try alternative selectors
             job_cards = soup.find_all('div', {'class': lambda x: x and 'job' in x.lower()})
         
-        for card in job_cards[:10]:  # Limit to first 10 jobs
+        for card in job_cards[:limit]:  # Limit to first 10 jobs by default
             try:
-                job = self.extract_job_info(card, search_term)
+                job = self.extract_job_info(card, search_term, now)
                 if job:
                     jobs.append(job)
             except Exception as e:
-                print(f"⚠️ Error parsing job card: {str(e)}")
+                logger.warning(f"⚠️ Error parsing job card: {str(e)}")
                 continue
         
         return jobs
     
-    def extract_job_info(self, card, search_term):
+    def extract_job_info(self, card, search_term, now=None):
         """Extract job information from a card"""
         try:
             # Extract job title
@@ -135,6 +219,10 @@ class LinkedInJobScraper:
             # Extract posting time
             time_elem = card.find('time')
             posted_date = time_elem.get_text(strip=True) if time_elem else "Recently"
+            now = now or datetime.now()
+            posted_at = self.parse_posted_at(
+                posted_date, time_elem.get('datetime') if time_elem else None, now
+            )
             
             job_data = {
                 'job_id': job_id,
@@ -143,16 +231,49 @@ class LinkedInJobScraper:
                 'location': location,
                 'url': job_url,
                 'posted_date': posted_date,
+                'posted_at': posted_at.strftime('%Y-%m-%d %H:%M:%S'),
                 'search_term': search_term,
-                'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                'scraped_at': now.strftime('%Y-%m-%d %H:%M:%S')
             }
             
             return job_data
             
         except Exception as e:
-            print(f"⚠️ Error extracting job info: {str(e)}")
+            logger.warning(f"⚠️ Error extracting job info: {str(e)}")
             return None
     
+    def parse_posted_at(self, posted_text, datetime_attr=None, now=None):
+        """Convert a card's posting time to an absolute datetime
+        
+        Returns the latest moment consistent with the listing, so a posting
+        is never judged older than it really is: "3 hours ago" -> now - 3h,
+        datetime="2024-01-15" -> end of that day (capped at now).
+        """
+        now = now or datetime.now()
+        
+        relative = RELATIVE_TIME_PATTERN.search(posted_text or '')
+        if relative:
+            amount = int(relative.group(1))
+            unit = RELATIVE_TIME_UNITS[relative.group(2).lower()]
+            # Sub-day offsets are more precise than the date-only attribute
+            if unit < timedelta(days=1) or not datetime_attr:
+                return now - amount * unit
+        
+        if datetime_attr:
+            try:
+                if 'T' in datetime_attr:
+                    parsed = datetime.fromisoformat(datetime_attr.replace('Z', '+00:00'))
+                    if parsed.tzinfo:
+                        parsed = parsed.astimezone().replace(tzinfo=None)
+                    return min(parsed, now)
+                day = datetime.strptime(datetime_attr.strip(), '%Y-%m-%d')
+                return min(day + timedelta(days=1, seconds=-1), now)
+            except ValueError:
+                pass
+        
+        # "Just now", "Recently" or nothing usable
+        return now
+    
     def get_user_agent_list(self):
         """Return list of user agents for rotation"""
         return [
@@ -168,6 +289,7 @@ class LinkedInJobScraper:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     scraper = LinkedInJobScraper()
     
     job_titles = ["DevOps Engineer", "Cloud Engineer"]
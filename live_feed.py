@@ -0,0 +1,216 @@
+"""
+Live Feed
+Pushes new jobs and cycle summaries to dashboards over Server-Sent Events
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from itertools import islice
+from threading import Thread, Lock
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# How often idle streams get a comment line so proxies keep them open
+HEARTBEAT_SECONDS = 15
+
+# Client reconnect delay suggested to EventSource (milliseconds)
+RETRY_MS = 5000
+
+
+def format_event(event_id, event, data):
+    """Encode one event in text/event-stream format"""
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+
+class LiveFeed:
+    """Ring buffer of recent events that any number of watchers can follow
+
+    publish() is called from the bot thread and only appends to the buffer;
+    watchers read from it by event ID, so nothing is stored per client and
+    the database is never touched.
+    """
+
+    def __init__(self, size=500):
+        self.events = deque(maxlen=size)
+        self.last_id = 0
+        self.lock = Lock()
+        # Set by SSEServer so publish() can wake its streams
+        self.on_publish = None
+
+    def publish(self, event, data):
+        """Add an event ('job', 'cycle', ...) with a JSON-serializable payload"""
+        with self.lock:
+            self.last_id += 1
+            self.events.append((self.last_id, event, json.dumps(data, ensure_ascii=False, default=str)))
+
+        if self.on_publish:
+            self.on_publish()
+
+    def since(self, last_event_id=None):
+        """Events newer than last_event_id, oldest first
+
+        An ID from before a restart (higher than anything buffered) replays
+        the whole buffer.
+        """
+        with self.lock:
+            if last_event_id is None or last_event_id > self.last_id or not self.events:
+                return list(self.events)
+            # IDs are consecutive, so the position in the buffer is direct
+            start = max(last_event_id - self.events[0][0] + 1, 0)
+            return list(islice(self.events, start, None))
+
+    def publish_job(self, job):
+        self.publish('job', {
+            key: job.get(key) for key in
+            ('job_id', 'title', 'company', 'location', 'url', 'posted_at', 'search_term')
+        })
+
+    def publish_cycle(self, **summary):
+        self.publish('cycle', summary)
+
+
+class SSEServer:
+    """Minimal asyncio HTTP server that streams a LiveFeed as text/event-stream
+
+    All clients are served by one event loop on one thread: an idle stream
+    is just a suspended coroutine waiting on a shared asyncio.Event, so
+    thousands of watchers cost no threads.
+
+    With backend=(host, port) it fronts the web app on a single port:
+    /events is served here and every other request is passed through to
+    the app and its response copied back.
+    """
+
+    def __init__(self, feed, host='0.0.0.0', port=8081, backend=None):
+        self.feed = feed
+        self.host = host
+        self.port = port
+        self.backend = backend
+        self.loop = None
+        self.changed = None
+        self.clients = 0
+
+    def start_in_thread(self):
+        """Run the server on its own daemon thread"""
+        thread = Thread(target=self._run, name="sse-server", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.changed = asyncio.Event()
+        self.feed.on_publish = lambda: self.loop.call_soon_threadsafe(self._broadcast)
+
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        if self.backend:
+            logger.info(f"📡 Serving port {self.port}: live feed at /events, everything else from the web app")
+        else:
+            logger.info(f"📡 Live feed streaming on port {self.port}")
+        try:
+            self.loop.run_until_complete(server.serve_forever())
+        finally:
+            self.loop.close()
+
+    def _broadcast(self):
+        # Wake every waiting stream, then arm a fresh event for the next publish
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            header_lines = []
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+                header_lines.append(line)
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode('latin-1').split()
+            url = urlsplit(parts[1]) if len(parts) > 1 else None
+            if url and url.path != '/events' and self.backend:
+                await self._proxy(reader, writer, request_line, header_lines)
+                return
+            if not url or url.path != '/events':
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+
+            last_id = headers.get('last-event-id') or parse_qs(url.query).get('last_event_id', [None])[0]
+            last_id = int(last_id) if last_id and last_id.isdigit() else None
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Access-Control-Allow-Origin: *\r\n"
+                b"X-Accel-Buffering: no\r\n"
+                b"Connection: keep-alive\r\n\r\n"
+                + f"retry: {RETRY_MS}\n\n".encode()
+            )
+            self.clients += 1
+            await self._stream(writer, last_id)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _proxy(self, reader, writer, request_line, header_lines):
+        """Pass one request through to the backend and its response back
+
+        The backend is asked to close the connection after responding, so
+        its EOF marks the end of the response; the client sees the same
+        Connection: close and opens a new connection for its next request.
+        """
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection(*self.backend)
+        except OSError:
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+
+        head = [request_line] + [
+            line for line in header_lines
+            if line.split(b':', 1)[0].strip().lower() not in (b'connection', b'keep-alive')
+        ]
+        backend_writer.write(b''.join(head) + b"Connection: close\r\n\r\n")
+
+        # The request body (if any) streams up while the response streams down
+        upload = asyncio.ensure_future(self._pipe(reader, backend_writer))
+        try:
+            await self._pipe(backend_reader, writer)
+        finally:
+            upload.cancel()
+            backend_writer.close()
+
+    @staticmethod
+    async def _pipe(reader, writer):
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            writer.write(data)
+            await writer.drain()
+
+    async def _stream(self, writer, last_id):
+        try:
+            while True:
+                # Grab the event before reading so a publish during drain() isn't missed
+                changed = self.changed
+                for event_id, event, data in self.feed.since(last_id):
+                    writer.write(format_event(event_id, event, data).encode('utf-8'))
+                    last_id = event_id
+                await writer.drain()
+
+                try:
+                    await asyncio.wait_for(changed.wait(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+        finally:
+            self.clients -= 1
@@ -0,0 +1,171 @@
+"""
+Log Setup
+Queue-based logging: console text plus rotating JSON lines in LOG_FILE
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+# Context attached to every record logged while it is set
+cycle_id_var = contextvars.ContextVar('cycle_id', default=None)
+search_term_var = contextvars.ContextVar('search_term', default=None)
+CONTEXT_VARS = {'cycle_id': cycle_id_var, 'search_term': search_term_var}
+
+# LogRecord attributes that are not user data
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Tag records logged inside the block, e.g. log_context(cycle_id=3)
+
+    Context variables are per thread and per asyncio task, so concurrent
+    searches on the async backend each keep their own search_term.
+    """
+    tokens = [(CONTEXT_VARS[name], CONTEXT_VARS[name].set(value)) for name, value in fields.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current context onto the record in the logging thread
+
+    Runs before the record is queued, because the listener thread has no
+    access to the caller's context.
+    """
+
+    def filter(self, record):
+        for name, var in CONTEXT_VARS.items():
+            if not hasattr(record, name):
+                setattr(record, name, var.get())
+        return True
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps tracebacks apart from the message
+
+    The stock prepare() formats the traceback into the message and drops
+    it; here it travels as exc_text, so the JSON file gets it in its own
+    'exception' field and the console still prints it under the message.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # Pickle-safe for multiprocessing queues: only strings are left
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context, extras"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def apply_levels(config):
+    """Set LOG_LEVEL on the root logger and LOG_LEVELS per module"""
+    logging.getLogger().setLevel(getattr(config, 'LOG_LEVEL', 'INFO'))
+    for name, level in getattr(config, 'LOG_LEVELS', {}).items():
+        logging.getLogger(name).setLevel(level)
+
+
+class ForwardHandler(logging.Handler):
+    """Re-logs records received from a child process in this process"""
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def _install_queue_handler(log_queue):
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+
+def setup_logging(config, log_queue=None):
+    """Route all logging through a queue to a background listener thread
+
+    Callers only put records on an unbounded in-memory queue; console and
+    file writes (including rotation) happen on the listener thread, so a
+    slow stdout or disk never stalls a scrape cycle. Safe to call twice.
+
+    A child process passes the multiprocessing queue from
+    forward_child_logs() as log_queue: its records are then written by
+    the parent, so only one process ever rotates LOG_FILE.
+    """
+    global _listener
+    if log_queue is not None:
+        _install_queue_handler(log_queue)
+        apply_levels(config)
+        return None
+
+    if _listener is not None:
+        apply_levels(config)
+        return _listener
+
+    console = logging.StreamHandler(sys.stdout)
+    # Console output reads exactly like the bot's messages always did
+    console.setFormatter(logging.Formatter('%(message)s'))
+    handlers = [console]
+
+    if getattr(config, 'ENABLE_LOGGING', True) and getattr(config, 'LOG_FILE', None):
+        file_handler = logging.handlers.RotatingFileHandler(
+            config.LOG_FILE,
+            maxBytes=getattr(config, 'LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=getattr(config, 'LOG_BACKUP_COUNT', 5),
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    _install_queue_handler(log_queue)
+    apply_levels(config)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued on exit
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def forward_child_logs(log_queue):
+    """Start a listener that logs a child process's records here; returns it"""
+    listener = logging.handlers.QueueListener(log_queue, ForwardHandler())
+    listener.start()
+    return listener
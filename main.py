@@ -2,212 +2,297 @@
 Main Job Automation Script
 Runs the scraper every 10 minutes and sends notifications
 """
+import logging
 import time
 import sys
 import os
 from datetime import datetime
-from linkedin_scraper import LinkedInJobScraper
-from telegram_notifier import TelegramNotifier
-from database import JobDatabase
+# Everything else is imported by the command that needs it, so quick
+# commands like 'stats' never load requests, bs4 or the scraper
+from bot_engine import BotEngine
 
-# Try to import config_render (for Render.com), fallback to config (for local)
-try:
-    import config_render as config
-except ImportError:
-    import config
+from config_loader import get_config
+from log_setup import setup_logging
 
-class JobAutomation:
+# config_render (for Render.com) or config (for local); reloaded between cycles
+config = get_config()
+
+logger = logging.getLogger(__name__)
+
+# Archived pages whose jobs go through process_jobs together during a replay
+REPLAY_BATCH_PAGES = 50
+
+class JobAutomation(BotEngine):
     def __init__(self):
         """Initialize automation components"""
-        self.scraper = LinkedInJobScraper()
-        self.db = JobDatabase(config.DATABASE_PATH)
-        
-        # Initialize Telegram notifier if configured
-        if config.TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN_HERE":
-            self.notifier = TelegramNotifier(
-                config.TELEGRAM_BOT_TOKEN,
-                config.TELEGRAM_CHAT_ID
-            )
-            self.notifications_enabled = True
-        else:
-            self.notifier = None
-            self.notifications_enabled = False
-            print("⚠️ Telegram not configured. Notifications disabled.")
+        super().__init__(config)
     
     def run_once(self):
         """Run scraper once"""
-        print("\n" + "=" * 70)
-        print(f"🚀 Job Scraper Running - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("=" * 70)
-        
-        try:
-            # Scrape jobs
-            jobs = self.scraper.scrape_jobs(config.JOB_TITLES, config.LOCATION)
-            
-            print(f"\n📊 Found {len(jobs)} total jobs")
-            
-            # Filter new jobs
-            new_jobs = self.db.get_new_jobs(jobs)
-            
-            print(f"✨ {len(new_jobs)} new jobs")
-            
-            # Log scraping activity
-            self.db.log_scrape(len(jobs), len(new_jobs), config.JOB_TITLES)
-            
-            # Send notifications for new jobs
-            if new_jobs and self.notifications_enabled and config.ENABLE_NOTIFICATIONS:
-                print(f"\n📱 Sending {len(new_jobs)} notification(s)...")
-                self.notifier.send_multiple_jobs(new_jobs)
-                print("✅ Notifications sent!")
-            elif new_jobs:
-                print("\n📋 New jobs found (notifications disabled):")
-                for job in new_jobs:
-                    print(f"   - {job['title']} at {job['company']}")
-            else:
-                print("\n😴 No new jobs found")
-            
-            # Show stats
-            stats = self.db.get_stats()
-            print(f"\n📈 Database Stats:")
-            print(f"   Total jobs tracked: {stats['total_jobs']}")
-            print(f"   Total scrapes: {stats['total_scrapes']}")
-            print(f"   Jobs in last 24h: {stats['recent_jobs']}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"\n❌ Error during scraping: {str(e)}")
-            
-            if self.notifications_enabled:
-                error_msg = f"⚠️ <b>Job Scraper Error</b>\n\n"
-                error_msg += f"Error: {str(e)}\n"
-                error_msg += f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                self.notifier.send_message(error_msg)
-            
-            return False
+        return self.run_cycle()
     
     def run_continuous(self):
         """Run scraper continuously every X minutes"""
-        print("=" * 70)
-        print("🤖 LinkedIn Job Automation Bot Started")
-        print("=" * 70)
-        print(f"⏰ Check interval: {config.CHECK_INTERVAL} seconds ({config.CHECK_INTERVAL/60} minutes)")
-        print(f"🔍 Job titles: {', '.join(config.JOB_TITLES)}")
-        print(f"📍 Location: {config.LOCATION}")
-        print(f"📱 Notifications: {'Enabled' if self.notifications_enabled else 'Disabled'}")
-        print("=" * 70)
-        
-        # Test Telegram connection
-        if self.notifications_enabled:
-            print("\n🔌 Testing Telegram connection...")
-            if self.notifier.test_connection():
-                # Send startup notification
-                startup_msg = f"✅ <b>Job Scraper Started!</b>\n\n"
-                startup_msg += f"🔍 Monitoring: {', '.join(config.JOB_TITLES)}\n"
-                startup_msg += f"📍 Location: {config.LOCATION}\n"
-                startup_msg += f"⏰ Check interval: {config.CHECK_INTERVAL/60} minutes\n"
-                startup_msg += f"🕒 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                self.notifier.send_message(startup_msg)
-        
-        print("\n💡 Press Ctrl+C to stop\n")
-        
-        iteration = 0
-        
-        try:
-            while True:
-                iteration += 1
-                print(f"\n{'='*70}")
-                print(f"🔄 Iteration #{iteration}")
-                
-                # Run scraper
-                self.run_once()
-                
-                # Wait for next iteration
-                print(f"\n⏳ Waiting {config.CHECK_INTERVAL} seconds until next check...")
-                print(f"⏰ Next check at: {self.get_next_check_time()}")
-                
-                time.sleep(config.CHECK_INTERVAL)
-                
-        except KeyboardInterrupt:
-            print("\n\n⏹️ Stopping job scraper...")
-            
-            if self.notifications_enabled:
-                shutdown_msg = f"⏹️ <b>Job Scraper Stopped</b>\n\n"
-                shutdown_msg += f"Total iterations: {iteration}\n"
-                shutdown_msg += f"Stopped at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                self.notifier.send_message(shutdown_msg)
-            
-            print("👋 Goodbye!")
-            sys.exit(0)
-    
-    def get_next_check_time(self):
-        """Calculate next check time"""
-        next_time = datetime.now().timestamp() + config.CHECK_INTERVAL
-        return datetime.fromtimestamp(next_time).strftime('%Y-%m-%d %H:%M:%S')
+        from runners import ForegroundRunner
+        ForegroundRunner(self).run()
     
     def test_setup(self):
         """Test the complete setup"""
-        print("🧪 Testing Job Automation Setup\n")
+        logger.info("🧪 Testing Job Automation Setup\n")
         
         # Test database
-        print("1️⃣ Testing database...")
+        logger.info("1️⃣ Testing database...")
         stats = self.db.get_stats()
-        print(f"   ✅ Database connected - {stats['total_jobs']} jobs tracked\n")
+        logger.info(f"   ✅ Database connected - {stats['total_jobs']} jobs tracked\n")
         
         # Test Telegram
-        print("2️⃣ Testing Telegram...")
+        logger.info("2️⃣ Testing Telegram...")
         if self.notifications_enabled:
             if self.notifier.test_connection():
                 test_msg = "🧪 <b>Test Message</b>\n\nYour LinkedIn job scraper is working!"
                 self.notifier.send_message(test_msg)
-                print("   ✅ Telegram bot working!\n")
+                logger.info("   ✅ Telegram bot working!\n")
             else:
-                print("   ❌ Telegram connection failed\n")
+                logger.error("   ❌ Telegram connection failed\n")
         else:
-            print("   ⚠️ Telegram not configured\n")
+            logger.warning("   ⚠️ Telegram not configured\n")
         
         # Test scraper
-        print("3️⃣ Testing LinkedIn scraper...")
+        logger.info("3️⃣ Testing LinkedIn scraper...")
         jobs = self.scraper.scrape_jobs(config.JOB_TITLES[:1], config.LOCATION)
-        print(f"   ✅ Scraper working - Found {len(jobs)} jobs\n")
+        logger.info(f"   ✅ Scraper working - Found {len(jobs)} jobs\n")
+        
+        logger.info("=" * 70)
+        logger.info("✅ All tests completed!")
+        logger.info("=" * 70)
+
+
+def parse_options(args):
+    """Parse '--name value' and bare '--flag' arguments into a dict"""
+    options = {}
+    i = 0
+    while i < len(args):
+        if args[i].startswith('--'):
+            name = args[i][2:].replace('-', '_')
+            if i + 1 < len(args) and not args[i + 1].startswith('--'):
+                options[name] = args[i + 1]
+                i += 1
+            else:
+                options[name] = True
+        i += 1
+    return options
+
+
+def pop_profile_flag(argv):
+    """Remove '--profile [N]' from argv; returns N (1 if omitted) or 0"""
+    if '--profile' not in argv:
+        return 0
+    i = argv.index('--profile')
+    del argv[i]
+    if i < len(argv) and argv[i].isdigit():
+        return int(argv.pop(i))
+    return 1
+
+
+def fetched_at(entry):
+    """When an archived page was fetched, None if the entry doesn't say"""
+    try:
+        return datetime.strptime(entry['fetched_at'], '%Y-%m-%d %H:%M:%S')
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def replay_archive(archive_dir, db_path, notify=False, workers=None):
+    """Run archived pages through parse -> dedup -> filter -> notify offline
+    
+    Nothing is fetched: pages come from the PageArchive, and unless notify is
+    set new jobs are only counted. Use a separate db_path to avoid marking
+    jobs as seen in the live database.
+    """
+    from page_archive import PageArchive
+    from parse_pool import ParsePool
+    
+    archive = PageArchive(archive_dir)
+    # Same components as the live bot, minus anything that fetches on its own
+    engine = BotEngine(config, db_path=db_path, offline=True, notifications=bool(notify))
+    # Pages are parsed on worker processes while earlier ones are processed
+    pool = ParsePool(getattr(config, 'PARSE_WORKERS', 0) if workers is None else workers)
+    
+    logger.info(f"⏪ Replaying {archive_dir} into {db_path}" + (f" ({pool.workers} parse workers)" if pool.workers else ""))
+    pages = total_jobs = total_new = 0
+    jobs = []
+    stored_before = engine.state.snapshot()['total_jobs']
+    started = time.perf_counter()
+    
+    # Every card is parsed; the live run may have kept only the first 10.
+    # "3 hours ago" means 3 hours before the page was fetched, not before now
+    parsed = pool.parse_many(
+        (html_bytes, entry['search_term'], None, fetched_at(entry), entry) for entry, html_bytes in archive
+    )
+    
+    # Processed in batches of pages so memory stays flat however big the archive
+    for entry, page_jobs in parsed:
+        pages += 1
+        for job in page_jobs:
+            job['search_location'] = entry['location']
+        jobs.extend(page_jobs)
         
-        print("=" * 70)
-        print("✅ All tests completed!")
-        print("=" * 70)
+        if pages % REPLAY_BATCH_PAGES == 0:
+            total_new += len(engine.process_jobs(jobs, started=started, end_cycle=False))
+            total_jobs += len(jobs)
+            jobs = []
+    
+    if jobs:
+        total_new += len(engine.process_jobs(jobs, started=started, end_cycle=False))
+        total_jobs += len(jobs)
+    pool.close()
+    
+    # The whole archive is one cycle: one scrape log entry, one cycle_end
+    stored = engine.state.snapshot()['total_jobs'] - stored_before
+    engine.finish_cycle(started, total_jobs, total_new, stored)
+    elapsed = time.perf_counter() - started
+    rate = pages / elapsed if elapsed else 0
+    logger.info(f"✅ Replayed {pages} page(s) in {elapsed:.2f}s ({rate:.1f} pages/s)")
+    logger.info(f"   Jobs parsed: {total_jobs}, new: {total_new}")
+    for rule, count in engine.job_filter.stats.most_common():
+        logger.info(f"   Filtered by {rule}: {count}")
+
+
+def export_command(args):
+    """Stream a table to a file (or stdout) in chunks"""
+    from exporter import export
+    
+    table = args[0] if args and not args[0].startswith('--') else 'jobs'
+    options = parse_options(args)
+    fmt = options.get('format', 'csv')
+    out = options.get('out')
+    
+    try:
+        pieces = export(config.DATABASE_PATH, table, fmt, since=options.get('since'),
+                        until=options.get('until'), search_term=options.get('term'))
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        return
+    
+    binary = fmt == 'parquet'
+    if out:
+        handle = open(out, 'wb' if binary else 'w', newline='' if not binary else None,
+                      encoding=None if binary else 'utf-8')
+    else:
+        handle = sys.stdout.buffer if binary else sys.stdout
+    
+    try:
+        for piece in pieces:
+            handle.write(piece)
+    finally:
+        if out:
+            handle.close()
+            print(f"✅ Exported {table} to {out}")
 
 
 def main():
     """Main entry point"""
+    # python main.py [once] --profile [N]: profile the first N cycles
+    profile_cycles = pop_profile_flag(sys.argv)
+    
+    # Console + LOG_FILE output, written from a background thread
+    setup_logging(config)
+    
     # Check if running on Replit - use special mode
     if os.environ.get('REPL_ID') or os.environ.get('REPLIT_DEPLOYMENT'):
-        print("🔍 Detected Replit environment")
+        logger.info("🔍 Detected Replit environment")
         from keep_alive import start_replit_bot
-        start_replit_bot()  # This will run Flask on main thread and bot in background
+        start_replit_bot(profile_cycles)  # This will run Flask on main thread and bot in background
+        return
+    
+    # Offline replay doesn't need the live components
+    if len(sys.argv) > 1 and sys.argv[1].lower() == "replay":
+        # python main.py replay [--archive DIR] [--db PATH] [--notify] [--workers N]
+        options = parse_options(sys.argv[2:])
+        archive_dir = options.get('archive') or getattr(config, 'PAGE_ARCHIVE_DIR', None)
+        if not archive_dir:
+            print("Usage: python main.py replay --archive DIR [--db PATH] [--notify] [--workers N]")
+            return
+        workers = int(options['workers']) if 'workers' in options else None
+        replay_archive(archive_dir, options.get('db', 'replay.db'), notify=options.get('notify', False),
+                       workers=workers)
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1].lower() == "export":
+        # python main.py export [jobs|scrape_history] [--format csv|jsonl|parquet]
+        #                       [--since DATE] [--until DATE] [--term TERM] [--out FILE]
+        export_command(sys.argv[2:])
+        return
+    
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else None
+    
+    # Database-only commands skip building the scraper/notifier entirely
+    if command in ("stats", "cleanup", "subscribe", "unsubscribe", "subscribers"):
+        from database import JobDatabase
+        db = JobDatabase(config.DATABASE_PATH)
+        database_command(command, db, sys.argv[2:])
+        return
+    
+    if command not in (None, "test", "once"):
+        print("Unknown command. Use: test, once, stats, cleanup, replay, export, subscribe, unsubscribe, subscribers, or no argument to run continuously")
         return
     
     # Regular mode for local/other platforms
     automation = JobAutomation()
+    if profile_cycles:
+        automation.profiler.request(profile_cycles)
     
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
-        
-        if command == "test":
-            automation.test_setup()
-        elif command == "once":
-            automation.run_once()
-        elif command == "stats":
-            stats = automation.db.get_stats()
-            print(f"\n📈 Database Statistics:")
-            print(f"   Total jobs tracked: {stats['total_jobs']}")
-            print(f"   Total scrapes: {stats['total_scrapes']}")
-            print(f"   Jobs in last 24h: {stats['recent_jobs']}")
-        else:
-            print("Unknown command. Use: test, once, stats, or no argument to run continuously")
+    if command == "test":
+        automation.test_setup()
+    elif command == "once":
+        automation.run_once()
     else:
         # Run continuously
         automation.run_continuous()
 
 
+def database_command(command, db, args):
+    """Commands that only read or maintain the database"""
+    if command == "stats":
+        stats = db.get_stats()
+        print(f"\n📈 Database Statistics:")
+        print(f"   Total jobs tracked: {stats['total_jobs']}")
+        print(f"   Total scrapes: {stats['total_scrapes']}")
+        print(f"   Jobs in last 24h: {stats['recent_jobs']}")
+    elif command == "cleanup":
+        from retention import RetentionTask
+        retention = RetentionTask(
+            db,
+            days=config.CLEAR_OLD_JOBS_AFTER_DAYS,
+            batch_size=getattr(config, 'RETENTION_BATCH_SIZE', 500),
+            archive_dir=getattr(config, 'JOBS_ARCHIVE_DIR', None)
+        )
+        jobs_deleted, history_deleted = retention.run()
+        print(f"🗑️ Removed {jobs_deleted} job(s) and {history_deleted} scrape log(s) "
+              f"older than {config.CLEAR_OLD_JOBS_AFTER_DAYS} days")
+    elif command == "subscribe":
+        # python main.py subscribe <chat_id> "Term A,Term B" ["Location A,Location B"]
+        if len(args) < 2:
+            print("Usage: python main.py subscribe <chat_id> \"Term A,Term B\" [\"Location A,Location B\"]")
+            return
+        terms = [t.strip() for t in args[1].split(',') if t.strip()]
+        locations = [l.strip() for l in args[2].split(',') if l.strip()] if len(args) > 2 else [config.LOCATION]
+        db.add_subscription(args[0], terms, locations)
+        print(f"✅ Subscribed {args[0]} to {', '.join(terms)} in {', '.join(locations)}")
+    elif command == "unsubscribe":
+        if len(args) < 1:
+            print("Usage: python main.py unsubscribe <chat_id>")
+            return
+        if db.remove_subscription(args[0]):
+            print(f"✅ Unsubscribed {args[0]}")
+        else:
+            print(f"⚠️ No subscription for {args[0]}")
+    elif command == "subscribers":
+        subscriptions = db.get_subscriptions()
+        print(f"\n👥 {len(subscriptions)} subscriber(s):")
+        for chat_id, terms, locations in subscriptions:
+            print(f"   {chat_id}: {', '.join(terms)} in {', '.join(locations)}")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,116 @@
+"""
+Page Archive
+Stores every fetched search page, compressed, so parsing can be replayed offline
+"""
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from threading import Lock
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+
+
+class PageArchive:
+    """Append-only archive of raw HTML pages
+
+    Pages are compressed one by one and appended to segment files
+    (segment-000001.seg, ...); index.jsonl holds one line per page with its
+    segment, byte offset, length, codec and search metadata. Nothing is
+    ever rewritten, so archiving costs one sequential write per page.
+    """
+
+    def __init__(self, directory, codec="zstd", segment_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_size = segment_size
+
+        if codec == "zstd" and zstandard is None:
+            logger.warning("⚠️ zstandard not installed, archiving pages with gzip")
+            codec = "gzip"
+        self.codec = codec
+
+        os.makedirs(directory, exist_ok=True)
+        self.lock = Lock()
+        self.segment = self._last_segment() or 1
+
+    def _last_segment(self):
+        segments = [name for name in os.listdir(self.directory)
+                    if name.startswith("segment-") and name.endswith(".seg")]
+        return max((int(name[8:-4]) for name in segments), default=0)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:06d}.seg")
+
+    def compress(self, data):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def decompress(data, codec):
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed pages")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def append(self, html_bytes, url, search_term, location, page=0):
+        """Compress and store one fetched page"""
+        blob = self.compress(html_bytes)
+
+        with self.lock:
+            path = self._segment_path(self.segment)
+            if os.path.exists(path) and os.path.getsize(path) + len(blob) > self.segment_size:
+                self.segment += 1
+                path = self._segment_path(self.segment)
+
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+
+            # Index line goes last: a crash never leaves an entry without data
+            entry = {
+                "segment": self.segment,
+                "offset": offset,
+                "length": len(blob),
+                "codec": self.codec,
+                "url": url,
+                "search_term": search_term,
+                "location": location,
+                "page": page,
+                "fetched_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            with open(os.path.join(self.directory, INDEX_FILE), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __iter__(self):
+        """Yield (entry, html_bytes) for every archived page, oldest first"""
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+
+        handles = {}
+        try:
+            with open(index_path, encoding="utf-8") as index:
+                for line in index:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+
+                    segment = entry["segment"]
+                    if segment not in handles:
+                        handles[segment] = open(self._segment_path(segment), "rb")
+                    f = handles[segment]
+                    f.seek(entry["offset"])
+                    yield entry, self.decompress(f.read(entry["length"]), entry["codec"])
+        finally:
+            for f in handles.values():
+                f.close()
@@ -0,0 +1,120 @@
+"""
+Parse Pool
+Parses search pages on worker processes so HTML parsing uses every core
+"""
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Order of the values in the tuples workers send back; search_term is
+# added again by the parent, so it is never pickled per job
+JOB_FIELDS = ('job_id', 'title', 'company', 'location', 'url', 'posted_date', 'posted_at', 'scraped_at')
+
+# Scraper instance of each worker process, created by _init_worker
+_scraper = None
+
+
+def _init_worker():
+    global _scraper
+    from linkedin_scraper import LinkedInJobScraper
+    _scraper = LinkedInJobScraper()
+
+
+def parse_page(html_bytes, search_term, limit=10, now=None):
+    """Parse one page into compact job tuples (runs in a worker)
+
+    now is when the page was fetched, for pages parsed later (replay).
+    """
+    scraper = _scraper
+    if scraper is None:
+        # Called in-process (workers=0 or the benchmark baseline)
+        _init_worker()
+        scraper = _scraper
+    jobs = scraper.parse_job_listings(html_bytes.decode('utf-8', errors='replace'), search_term,
+                                      limit=limit, now=now)
+    return [tuple(job[field] for field in JOB_FIELDS) for job in jobs]
+
+
+def _parse_chunk(pages):
+    """Parse a list of (html_bytes, search_term, limit, now) in one round trip"""
+    return [parse_page(*page) for page in pages]
+
+
+def jobs_from_tuples(rows, search_term):
+    """Turn worker tuples back into the job dicts the rest of the bot uses"""
+    return [dict(zip(JOB_FIELDS, row), search_term=search_term) for row in rows]
+
+
+class ParsePool:
+    """Process pool for parse_job_listings
+
+    Pages go to workers as raw bytes and come back as tuples, and pages are
+    sent in chunks so the per-task pickling overhead is paid once per chunk
+    rather than once per page. With workers=0 everything is parsed in the
+    calling process, which is faster for a handful of pages (see
+    benchmarks/bench_parse.py for where the crossover is).
+    """
+
+    def __init__(self, workers=None, chunksize=4):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunksize = max(1, chunksize)
+        self.executor = None
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def parse(self, html_bytes, search_term, limit=10):
+        """Parse one page, returns job dicts"""
+        if self.executor is None:
+            rows = parse_page(html_bytes, search_term, limit)
+        else:
+            rows = self.executor.submit(parse_page, html_bytes, search_term, limit).result()
+        return jobs_from_tuples(rows, search_term)
+
+    async def parse_async(self, html_bytes, search_term, limit=10):
+        """parse() for the asyncio backend; the event loop never parses"""
+        loop = asyncio.get_running_loop()
+        if self.executor is None:
+            rows = await asyncio.to_thread(parse_page, html_bytes, search_term, limit)
+        else:
+            rows = await loop.run_in_executor(self.executor, parse_page, html_bytes, search_term, limit)
+        return jobs_from_tuples(rows, search_term)
+
+    def parse_many(self, pages):
+        """Parse (html_bytes, search_term, limit, now, context) items, yielding (context, jobs) in order
+
+        now is when the page was fetched (None for the current time).
+        context is anything the caller needs back with the result (e.g. the
+        archive entry); it never leaves this process. Only a bounded window
+        of chunks is in flight, so arbitrarily large archives can be
+        streamed through without loading them at once.
+        """
+        pages = iter(pages)
+
+        if self.executor is None:
+            for html_bytes, search_term, limit, now, context in pages:
+                yield context, jobs_from_tuples(parse_page(html_bytes, search_term, limit, now), search_term)
+            return
+
+        window = self.workers * 2
+        pending = deque()
+        while True:
+            while len(pending) < window:
+                chunk = list(islice(pages, self.chunksize))
+                if not chunk:
+                    break
+                work = [page[:4] for page in chunk]
+                pending.append((chunk, self.executor.submit(_parse_chunk, work)))
+
+            if not pending:
+                return
+
+            chunk, future = pending.popleft()
+            for (_, search_term, _, _, context), rows in zip(chunk, future.result()):
+                yield context, jobs_from_tuples(rows, search_term)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,136 @@
+"""
+Cycle Profiler
+Captures cProfile stats and sampled stacks of the next N scrape cycles on request
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """Samples every thread's stack on a background thread
+
+    cProfile only sees the thread that runs the cycle; sampling also
+    catches the async backend's event loop, enrichment workers, etc. Stacks
+    are aggregated in the collapsed format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._loop, name="stack-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+    def _loop(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[self.collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def collapse(thread_name, frame):
+        """'thread;outer_module:func;...;inner_module:func' for one stack"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            frames.append(f"{module}:{code.co_name}".replace(';', ':'))
+            frame = frame.f_back
+        frames.append(thread_name.replace(';', ':'))
+        return ';'.join(reversed(frames))
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CycleProfiler:
+    """Profiles the next N cycles when asked to, and costs nothing otherwise
+
+    Switched off, the only cost is the engine checking `remaining` once per
+    cycle. request() is safe to call from signal handlers, other threads
+    and web requests. At most `max_pending` cycles are queued, and only the
+    files of the last `keep` profiled cycles are kept on disk.
+    """
+
+    def __init__(self, output_dir, sample_interval=0.005, max_pending=10, keep=10):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.max_pending = max_pending
+        self.keep = keep
+        self.remaining = 0
+        self.last_outputs = []
+
+    def request(self, cycles=1):
+        """Profile the next `cycles` cycles (on top of any already requested)"""
+        # No lock: this can run inside a signal handler on the main thread
+        self.remaining = min(self.remaining + max(1, int(cycles)), self.max_pending)
+        return self.remaining
+
+    @contextmanager
+    def capture(self, label):
+        """Profile the enclosed block and write <prefix>.pstats / .collapsed"""
+        self.remaining = max(0, self.remaining - 1)
+
+        import cProfile
+        profile = cProfile.Profile()
+        sampler = StackSampler(self.sample_interval)
+        started = time.perf_counter()
+
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            self.last_outputs = self._write(label, profile, sampler, time.perf_counter() - started)
+
+    def _write(self, label, profile, sampler, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{label}")
+
+        profile.dump_stats(prefix + '.pstats')
+        sampler.write(prefix + '.collapsed')
+
+        logger.info(f"🔬 Profiled {label} ({elapsed:.1f}s, {sampler.samples} samples): {prefix}.pstats, {prefix}.collapsed")
+        self._prune()
+        return [prefix + '.pstats', prefix + '.collapsed']
+
+    def _prune(self):
+        """Delete all but the newest `keep` profiles' files"""
+        prefixes = sorted(
+            (os.path.join(self.output_dir, name[:-len('.pstats')])
+             for name in os.listdir(self.output_dir)
+             if name.startswith('profile-') and name.endswith('.pstats')),
+            key=lambda prefix: os.path.getmtime(prefix + '.pstats'),
+        )
+        for prefix in prefixes[:-self.keep]:
+            for path in (prefix + '.pstats', prefix + '.collapsed'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
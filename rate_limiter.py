@@ -0,0 +1,95 @@
+"""
+Rate Limiter
+Token buckets shared by the threaded and asyncio code paths
+"""
+import asyncio
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    """Allows `rate` operations per second with bursts of up to `capacity`
+
+    The bookkeeping is a few arithmetic operations under a lock, so the same
+    bucket can be used from threads (acquire) and from coroutines
+    (acquire_async) without either side ever blocking the other for long.
+    clock can be injected, e.g. a fake one in tests.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.lock = Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        """Take tokens now, returns how many seconds the caller must wait first
+
+        The tokens are reserved even when the answer is > 0, so waiters are
+        served in the order they called reserve().
+        """
+        with self.lock:
+            self._refill(self.clock())
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def try_acquire(self, tokens=1):
+        """Take tokens only if they are available right now"""
+        with self.lock:
+            self._refill(self.clock())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def available(self):
+        """Tokens currently in the bucket (may be negative while reserved)"""
+        with self.lock:
+            self._refill(self.clock())
+            return self.tokens
+
+    def acquire(self, tokens=1):
+        """Block the calling thread until tokens are available"""
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens=1):
+        """Wait on the event loop until tokens are available"""
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class KeyedRateLimiter:
+    """One TokenBucket per key (e.g. per Telegram chat), created on demand"""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.buckets = {}
+        self.lock = Lock()
+
+    def bucket(self, key):
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.rate, self.capacity, self.clock)
+            return bucket
+
+    def acquire(self, key, tokens=1):
+        self.bucket(key).acquire(tokens)
+
+    async def acquire_async(self, key, tokens=1):
+        await self.bucket(key).acquire_async(tokens)
@@ -0,0 +1,144 @@
+"""
+Retention Task
+Deletes old jobs and scrape history in the background, between scrape cycles
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from threading import Thread, Event
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionTask:
+    """Keeps the database small without ever holding a long write lock
+
+    Rows are removed in small batches (each its own short transaction on an
+    indexed column) with a pause between batches, and work only happens
+    while no scrape cycle is running.
+    """
+
+    def __init__(self, db, days=30, interval=3600, batch_size=500, pause=0.5,
+                 archive_dir=None, vacuum_pages=1000, state=None):
+        self.db = db
+        # BotState whose totals are reduced by what each pass removes
+        self.state = state
+        self.days = days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.pause = pause
+        self.archive_dir = archive_dir
+        self.vacuum_pages = vacuum_pages
+
+        # Set while the bot is between cycles; retention waits on it
+        self.idle = Event()
+        self.idle.set()
+        self.stopped = Event()
+        self.thread = None
+
+    def configure(self, days=None, interval=None, batch_size=None, archive_dir=None):
+        """Change retention settings; used from the next pass on"""
+        if days is not None:
+            self.days = days
+        if interval is not None:
+            self.interval = interval
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self.archive_dir = archive_dir
+
+    def cycle_started(self):
+        """Called by the bot loop before a scrape cycle"""
+        self.idle.clear()
+
+    def cycle_finished(self):
+        """Called by the bot loop after a scrape cycle"""
+        self.idle.set()
+
+    def start(self):
+        """Run retention every `interval` seconds on a daemon thread"""
+        if self.thread and self.thread.is_alive():
+            return
+
+        self.stopped.clear()
+        self.thread = Thread(target=self._loop, name="retention", daemon=True)
+        self.thread.start()
+        logger.info(f"🧹 Retention task started (keeping {self.days} days)")
+
+    def stop(self):
+        """Stop the background thread after the current batch"""
+        self.stopped.set()
+        self.idle.set()
+
+    def _loop(self):
+        while not self.stopped.is_set():
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"❌ Retention error: {str(e)}")
+            self.stopped.wait(self.interval)
+
+    def _wait_for_idle(self):
+        """Block until no cycle is running; False if the task was stopped"""
+        self.idle.wait()
+        return not self.stopped.is_set()
+
+    def run(self):
+        """One full retention pass, returns (jobs_deleted, history_deleted)"""
+        cutoff = self.db.retention_cutoff(self.days)
+        archive_path = self._archive_path() if self.archive_dir else None
+        jobs_deleted = 0
+        history_deleted = 0
+
+        while self._wait_for_idle():
+            if archive_path:
+                # Archive first: rows are only deleted once they are safely on
+                # disk, so a failed write leaves them in the database
+                rows = self.db.get_old_jobs_batch(cutoff, self.batch_size)
+                self._archive(archive_path, [{k: v for k, v in row.items() if k != 'rowid'} for row in rows])
+                count = self.db.delete_jobs([row['rowid'] for row in rows], [row['job_id'] for row in rows])
+            else:
+                count = self.db.delete_old_jobs_batch(cutoff, self.batch_size)
+
+            jobs_deleted += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.pause)
+
+        while self._wait_for_idle():
+            count = self.db.prune_scrape_history_batch(cutoff, self.batch_size)
+            history_deleted += count
+            if count < self.batch_size:
+                break
+            time.sleep(self.pause)
+
+        if self.state and (jobs_deleted or history_deleted):
+            self.state.record_pruned(jobs_deleted, history_deleted)
+
+        if (jobs_deleted or history_deleted) and self._wait_for_idle():
+            if not self.db.incremental_vacuum(self.vacuum_pages):
+                logger.warning("⚠️ Freed space is not returned to disk: the database is not in "
+                               "incremental auto-vacuum mode; stop the bot and run "
+                               "sqlite3 <db> 'PRAGMA auto_vacuum=INCREMENTAL; VACUUM;' once")
+            logger.info(f"🗑️ Retention removed {jobs_deleted} job(s) and {history_deleted} scrape log(s)")
+
+        return jobs_deleted, history_deleted
+
+    def _archive_path(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        return os.path.join(self.archive_dir, f"jobs-{datetime.now().strftime('%Y%m%d')}.jsonl.gz")
+
+    def _archive(self, path, rows):
+        """Append rows to a gzip JSON-lines file and fsync it; raises if that fails"""
+        if not rows:
+            return
+
+        # Appending creates a new gzip member; readers see one continuous stream
+        with open(path, 'ab') as raw:
+            with gzip.open(raw, 'wt', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            raw.flush()
+            os.fsync(raw.fileno())
@@ -0,0 +1,191 @@
+"""
+Runners
+Decide where the BotEngine loop runs: foreground, thread, asyncio or a child process
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import sys
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ForegroundRunner:
+    """Runs the engine on the calling thread until Ctrl+C"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def run(self):
+        self.engine.start()
+        logger.info("\n💡 Press Ctrl+C to stop\n")
+
+        try:
+            self.engine.run_forever()
+        except KeyboardInterrupt:
+            self.engine.shutdown()
+            sys.exit(0)
+
+
+class ThreadRunner:
+    """Runs the engine on a daemon thread, e.g. next to a web server"""
+
+    def __init__(self, engine, startup_title="Job Scraper Started!"):
+        self.engine = engine
+        self.startup_title = startup_title
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="bot-engine", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        self.engine.start(startup_title=self.startup_title)
+        self.engine.run_forever(self.stopped)
+
+    def stop(self, timeout=None):
+        """Finish the current cycle, then shut the engine down"""
+        self.stopped.set()
+        if self.thread:
+            self.thread.join(timeout)
+        self.engine.shutdown()
+
+    def metrics(self):
+        return self.engine.metrics()
+
+
+class AsyncioRunner:
+    """Runs the engine as a task inside an existing event loop
+
+    Cycles are blocking (requests, sqlite), so each one runs in the default
+    executor; waiting between cycles is an asyncio.sleep and cancelling the
+    task stops the bot cleanly.
+    """
+
+    def __init__(self, engine, startup_title="Job Scraper Started!"):
+        self.engine = engine
+        self.startup_title = startup_title
+        self.stopped = threading.Event()
+        self.task = None
+
+    async def run(self):
+        engine = self.engine
+        await asyncio.to_thread(engine.start, self.startup_title)
+
+        try:
+            while not self.stopped.is_set():
+                await asyncio.to_thread(engine.before_cycle, self.stopped)
+                if self.stopped.is_set():
+                    break
+                succeeded = await asyncio.to_thread(engine.run_cycle)
+                await asyncio.sleep(engine.next_delay(succeeded))
+        except asyncio.CancelledError:
+            self.stopped.set()
+            raise
+        finally:
+            await asyncio.to_thread(engine.shutdown)
+
+    def start(self):
+        """Schedule run() on the running loop and return the task"""
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    def stop(self):
+        """Stop after the current cycle (or immediately while waiting)"""
+        self.stopped.set()
+        if self.task:
+            self.task.cancel()
+
+    def metrics(self):
+        return self.engine.metrics()
+
+
+def _process_main(stop_event, metrics_queue, log_queue, startup_title):
+    """Child process entry point: builds its own engine from the config file"""
+    from config_loader import get_config
+    from bot_engine import BotEngine
+    from log_setup import setup_logging
+
+    config = get_config()
+    # Records go back to the parent, which owns the console and LOG_FILE
+    setup_logging(config, log_queue=log_queue)
+    engine = BotEngine(config)
+
+    def publish(summary=None):
+        metrics = engine.metrics()
+        if metrics['last_check']:
+            metrics['last_check'] = metrics['last_check'].strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            metrics_queue.put_nowait(metrics)
+        except queue.Full:
+            pass
+
+    engine.add_hook('cycle_end', publish)
+    engine.add_hook('error', lambda error: publish())
+    engine.start(startup_title=startup_title)
+    publish()
+    try:
+        engine.run_forever(stop_event)
+    finally:
+        engine.shutdown()
+
+
+class ProcessRunner:
+    """Runs the engine in a separate process
+
+    The child owns every component (database connection, HTTP sessions,
+    threads); the parent only sees the metrics it pushes after each cycle.
+    """
+
+    def __init__(self, startup_title="Job Scraper Started!"):
+        self.startup_title = startup_title
+        self.stop_event = multiprocessing.Event()
+        self.metrics_queue = multiprocessing.Queue(maxsize=100)
+        self.log_queue = multiprocessing.Queue()
+        self.log_listener = None
+        self.process = None
+        self.latest = {}
+
+    def start(self):
+        if self.process and self.process.is_alive():
+            return
+        self.stop_event.clear()
+        if self.log_listener is None:
+            from log_setup import forward_child_logs
+            self.log_listener = forward_child_logs(self.log_queue)
+        self.process = multiprocessing.Process(
+            target=_process_main,
+            args=(self.stop_event, self.metrics_queue, self.log_queue, self.startup_title),
+            name="bot-engine",
+            daemon=True
+        )
+        self.process.start()
+        logger.info(f"🧵 Bot engine running in process {self.process.pid}")
+
+    def stop(self, timeout=30):
+        """Ask the child to finish its cycle and exit; terminate if it doesn't"""
+        self.stop_event.set()
+        if self.process:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        if self.log_listener:
+            self.log_listener.stop()
+            self.log_listener = None
+
+    def metrics(self):
+        """Latest metrics reported by the child"""
+        while True:
+            try:
+                self.latest = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                break
+        return dict(self.latest, alive=bool(self.process and self.process.is_alive()),
+                    checked_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
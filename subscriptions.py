@@ -0,0 +1,142 @@
+"""
+Subscription Router
+Lets one scraper serve many Telegram chats, each with their own searches
+"""
+from collections import defaultdict
+
+
+def normalize(text):
+    """Case/whitespace-insensitive key for terms and locations"""
+    return ' '.join(str(text).lower().split())
+
+
+class SubscriptionIndex:
+    """Inverted index from (search term, location) queries to chat IDs
+
+    Matching a job costs one dict lookup per query the job was found under,
+    independent of how many subscribers exist.
+    """
+
+    def __init__(self):
+        self.chats_by_query = defaultdict(set)
+        # Display spelling of each normalized term/location, first one wins
+        self.terms = {}
+        self.locations = {}
+
+    def add(self, chat_id, search_terms, locations):
+        """Subscribe chat_id to every term in every location"""
+        for location in locations:
+            location_key = normalize(location)
+            self.locations.setdefault(location_key, location.strip())
+            for term in search_terms:
+                term_key = normalize(term)
+                self.terms.setdefault(term_key, term.strip())
+                self.chats_by_query[(term_key, location_key)].add(str(chat_id))
+
+    def queries(self):
+        """Union of all subscribed queries, grouped as {location: [terms]}"""
+        grouped = defaultdict(list)
+        for term_key, location_key in sorted(self.chats_by_query):
+            grouped[self.locations[location_key]].append(self.terms[term_key])
+        return dict(grouped)
+
+    def match(self, query_keys):
+        """Chat IDs subscribed to any of the given (term, location) keys"""
+        chats = set()
+        for key in query_keys:
+            chats |= self.chats_by_query.get(key, set())
+        return chats
+
+    def chat_ids(self):
+        """Every subscribed chat ID"""
+        return set().union(*self.chats_by_query.values())
+
+    def __len__(self):
+        return len(self.chat_ids())
+
+
+class SubscriptionRouter:
+    """Scrapes the union of every subscriber's queries once and routes results
+
+    The chat from TELEGRAM_CHAT_ID with JOB_TITLES/LOCATION is always
+    included, so a bot without any subscriptions behaves exactly as before.
+    """
+
+    def __init__(self, db, default_chat_id, default_terms, default_location):
+        self.db = db
+        self.default_chat_id = default_chat_id
+        self.default_terms = list(default_terms)
+        self.default_location = default_location
+        self.index = self.build_index()
+
+    def build_index(self):
+        """Build the inverted index from the config subscriber and the DB"""
+        index = SubscriptionIndex()
+        index.add(self.default_chat_id, self.default_terms, [self.default_location])
+        for chat_id, search_terms, locations in self.db.get_subscriptions():
+            index.add(chat_id, search_terms, locations)
+        return index
+
+    def update_defaults(self, default_chat_id, default_terms, default_location):
+        """Replace the config subscriber; takes effect on the next reload()"""
+        self.default_chat_id = default_chat_id
+        self.default_terms = list(default_terms)
+        self.default_location = default_location
+
+    def reload(self):
+        """Pick up subscriptions added or removed since the last cycle"""
+        self.index = self.build_index()
+
+    @property
+    def search_terms(self):
+        """Every distinct search term being scraped"""
+        return sorted(set(self.index.terms.values()))
+
+    def scrape(self, scraper, since=None, max_pages=1):
+        """Run each distinct query once and tag jobs with the location searched"""
+        if getattr(scraper, 'is_async', False):
+            # Every location in flight at once on the scraper's event loop
+            return scraper.loop.run(self.scrape_async(scraper, since, max_pages))
+
+        all_jobs = []
+        for location, terms in self.index.queries().items():
+            for job in scraper.scrape_jobs(terms, location, since=since, max_pages=max_pages):
+                job['search_location'] = location
+                all_jobs.append(job)
+        return all_jobs
+
+    async def scrape_async(self, scraper, since=None, max_pages=1):
+        """scrape() for an AsyncLinkedInJobScraper, all queries concurrently"""
+        import asyncio
+
+        queries = list(self.index.queries().items())
+        results = await asyncio.gather(*(
+            scraper.scrape_jobs_async(terms, location, since=since, max_pages=max_pages)
+            for location, terms in queries
+        ))
+
+        all_jobs = []
+        for (location, terms), jobs in zip(queries, results):
+            for job in jobs:
+                job['search_location'] = location
+                all_jobs.append(job)
+        return all_jobs
+
+    def route(self, new_jobs, all_jobs):
+        """Group new jobs by recipient chat ID
+
+        all_jobs is the full scrape: a posting can come back under several
+        queries but is only 'new' once, so every query it appeared under is
+        collected before looking up subscribers.
+        """
+        queries_by_job = defaultdict(set)
+        for job in all_jobs:
+            queries_by_job[job['job_id']].add(
+                (normalize(job['search_term']), normalize(job.get('search_location', self.default_location)))
+            )
+
+        routed = defaultdict(list)
+        for job in new_jobs:
+            for chat_id in self.index.match(queries_by_job[job['job_id']]):
+                routed[chat_id].append(job)
+        return dict(routed)
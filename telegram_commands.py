@@ -0,0 +1,154 @@
+"""
+Telegram Commands
+Answers /stats, /recent, /search, /pause and /resume from chat
+"""
+import html
+import logging
+import time
+from threading import Thread, Event
+
+logger = logging.getLogger(__name__)
+
+HELP_TEXT = (
+    "🤖 <b>Commands</b>\n\n"
+    "/stats - scraping statistics\n"
+    "/recent - latest jobs found\n"
+    "/search &lt;term&gt; - search recent jobs\n"
+    "/pause - stop checking for jobs (admin)\n"
+    "/resume - start checking again (admin)"
+)
+
+
+class TelegramCommandListener:
+    """Long-polls getUpdates on a background thread and replies from BotState
+
+    Replies are built from in-memory counters and caches only, and polling
+    and replies use this thread's own pooled session, so commands never
+    touch the database or slow down a scrape cycle. A command that fails is
+    logged and skipped; the listener keeps running.
+    """
+
+    def __init__(self, notifier, state, admin_chat_id, allowed_chats=None):
+        self.notifier = notifier
+        self.state = state
+        self.admin_chat_id = str(admin_chat_id)
+        # Callable returning chat IDs allowed to use read-only commands
+        self.allowed_chats = allowed_chats or (lambda: set())
+        self.offset = None
+        self.stopped = Event()
+        self.thread = None
+
+        self.handlers = {
+            '/start': self.cmd_help,
+            '/help': self.cmd_help,
+            '/stats': self.cmd_stats,
+            '/recent': self.cmd_recent,
+            '/search': self.cmd_search,
+            '/pause': self.cmd_pause,
+            '/resume': self.cmd_resume,
+        }
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = Thread(target=self._loop, name="telegram-commands", daemon=True)
+        self.thread.start()
+        logger.info("💬 Listening for Telegram commands")
+
+    def stop(self):
+        self.stopped.set()
+
+    def _loop(self):
+        while not self.stopped.is_set():
+            try:
+                updates = self.notifier.get_updates(self.offset)
+            except Exception as e:
+                logger.warning(f"⚠️ Telegram command polling error: {str(e)}")
+                self.stopped.wait(30)
+                continue
+
+            for update in updates:
+                self.offset = update['update_id'] + 1
+                message = update.get('message') or {}
+                text = (message.get('text') or '').strip()
+                if text.startswith('/'):
+                    try:
+                        self.handle(str(message['chat']['id']), text)
+                    except Exception:
+                        logger.error(f"❌ Error handling Telegram command {text!r}", exc_info=True)
+
+    def handle(self, chat_id, text):
+        """Dispatch one command and send the reply"""
+        command, _, argument = text.partition(' ')
+        # "/stats@MyBot" in group chats
+        command = command.split('@')[0].lower()
+
+        if chat_id != self.admin_chat_id and chat_id not in self.allowed_chats():
+            return
+
+        handler = self.handlers.get(command)
+        if not handler:
+            reply = "❓ Unknown command. Send /help for the list."
+        else:
+            reply = handler(chat_id, argument.strip())
+
+        self.notifier.send_message(reply, chat_id=chat_id)
+
+    def cmd_help(self, chat_id, argument):
+        return HELP_TEXT
+
+    def cmd_stats(self, chat_id, argument):
+        stats = self.state.snapshot()
+        last_check = stats['last_check'].strftime('%Y-%m-%d %H:%M:%S') if stats['last_check'] else "not yet"
+        message = "📈 <b>Job Bot Stats</b>\n\n"
+        message += f"Total jobs tracked: {stats['total_jobs']}\n"
+        message += f"Total scrapes: {stats['total_scrapes']}\n"
+        message += f"Jobs in last 24h: {stats['recent_jobs']}\n"
+        message += f"Last check: {last_check} ({stats['last_jobs_found']} found, {stats['last_new_jobs']} new)\n"
+        message += f"Status: {'⏸️ paused' if stats['paused'] else '▶️ running'}"
+        return message
+
+    def cmd_recent(self, chat_id, argument):
+        jobs = self.state.latest_jobs(limit=5)
+        if not jobs:
+            return "😴 No jobs found yet"
+        return "🆕 <b>Latest jobs</b>\n\n" + "\n".join(self.format_job(job) for job in jobs)
+
+    def cmd_search(self, chat_id, argument):
+        if not argument:
+            return "Usage: /search &lt;term&gt;"
+        jobs = self.state.search_recent(argument)
+        if not jobs:
+            return f"🔍 No recent jobs match '{html.escape(argument)}'"
+        return f"🔍 <b>Recent jobs matching '{html.escape(argument)}'</b>\n\n" + \
+            "\n".join(self.format_job(job) for job in jobs)
+
+    def cmd_pause(self, chat_id, argument):
+        if chat_id != self.admin_chat_id:
+            return "⛔ Only the bot owner can pause it"
+        self.state.paused = True
+        return "⏸️ Paused. Send /resume to start checking again."
+
+    def cmd_resume(self, chat_id, argument):
+        if chat_id != self.admin_chat_id:
+            return "⛔ Only the bot owner can resume it"
+        self.state.paused = False
+        return "▶️ Resumed."
+
+    @staticmethod
+    def format_job(job):
+        title = html.escape(job.get('title') or 'N/A')
+        line = f"• <a href='{job['url']}'>{title}</a>" if job.get('url') not in (None, "", "N/A") else f"• {title}"
+        return line + f" - {html.escape(job.get('company') or 'N/A')}, {html.escape(job.get('location') or 'N/A')}"
+
+
+def wait_while_paused(state, poll_seconds=5, stop_event=None):
+    """Block the bot loop while /pause is in effect (or until stop_event is set)"""
+    if state.paused:
+        logger.info("⏸️ Paused from Telegram, waiting for /resume...")
+    while state.paused:
+        if stop_event is None:
+            time.sleep(poll_seconds)
+        elif stop_event.wait(poll_seconds):
+            return
@@ -4,7 +4,18 @@ Sends job alerts via Telegram Bot
 """
 import requests
 import json
+import html
+import threading
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Characters of the job description shown in an alert
+DESCRIPTION_PREVIEW_LENGTH = 400
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
 
 class TelegramNotifier:
     def __init__(self, bot_token, chat_id):
@@ -18,58 +29,145 @@ class TelegramNotifier:
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.api_url = f"https://api.telegram.org/bot{bot_token}"
+        # Pooled connections per thread: the bot loop and the command
+        # listener both call the API, and a Session isn't thread-safe
+        self.local = threading.local()
+    
+    @property
+    def session(self):
+        """This thread's requests.Session, created on first use"""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+    
+    def update_credentials(self, bot_token, chat_id):
+        """Switch bot token/chat ID in place (used by config reloads)"""
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.api_url = f"https://api.telegram.org/bot{bot_token}"
         
-    def send_message(self, message, parse_mode="HTML"):
-        """Send a text message"""
+    def send_message(self, message, parse_mode="HTML", chat_id=None):
+        """Send a text message (to the configured chat unless chat_id is given)
+
+        Returns the sent message's ID, or False if sending failed.
+        """
         url = f"{self.api_url}/sendMessage"
         
         payload = {
-            'chat_id': self.chat_id,
+            'chat_id': chat_id or self.chat_id,
+            'text': message,
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': False
+        }
+        
+        try:
+            response = self.session.post(url, json=payload, timeout=10)
+            
+            if response.status_code == 200:
+                return response.json()['result']['message_id']
+            else:
+                logger.error(f"❌ Telegram API Error: {response.text}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"❌ Error sending Telegram message: {str(e)}")
+            return False
+    
+    def edit_message(self, chat_id, message_id, message, parse_mode="HTML"):
+        """Replace the text of a message sent earlier"""
+        url = f"{self.api_url}/editMessageText"
+        
+        payload = {
+            'chat_id': chat_id,
+            'message_id': message_id,
             'text': message,
             'parse_mode': parse_mode,
             'disable_web_page_preview': False
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.session.post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 return True
             else:
-                print(f"❌ Telegram API Error: {response.text}")
+                logger.error(f"❌ Telegram API Error: {response.text}")
                 return False
                 
         except Exception as e:
-            print(f"❌ Error sending Telegram message: {str(e)}")
+            logger.error(f"❌ Error editing Telegram message: {str(e)}")
             return False
     
-    def send_job_alert(self, job):
+    def send_job_alert(self, job, chat_id=None):
         """Send formatted job alert"""
         message = self.format_job_message(job)
-        return self.send_message(message)
+        return self.send_message(message, chat_id=chat_id)
     
-    def send_multiple_jobs(self, jobs):
-        """Send multiple job alerts"""
+    def send_multiple_jobs(self, jobs, chat_id=None):
+        """Send multiple job alerts
+
+        Returns (job, index, message_id) for each alert that was sent.
+        """
+        sent = []
         if not jobs:
-            return
+            return sent
         
         # Send summary first
-        summary = f"🎯 <b>New Job Alerts!</b>\n\n"
-        summary += f"Found {len(jobs)} new job(s)\n"
-        summary += f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        summary += "━━━━━━━━━━━━━━━━━━━━"
-        
-        self.send_message(summary)
+        self.send_message(self.format_summary(jobs), chat_id=chat_id)
         
         # Send individual job details
         for i, job in enumerate(jobs, 1):
             message = self.format_job_message(job, index=i)
-            self.send_message(message)
+            message_id = self.send_message(message, chat_id=chat_id)
+            if message_id:
+                sent.append((job, i, message_id))
             
             # Add delay between messages to avoid rate limiting
             if i < len(jobs):
                 import time
                 time.sleep(1)
+        
+        return sent
+    
+    def send_routed(self, routed, digests=None):
+        """Send each chat its jobs, given {chat_id: [jobs]}, then its digest if any
+
+        Returns {chat_id: [(job, index, message_id)]} for the sent alerts.
+        """
+        digests = digests or {}
+        sent = {}
+        for chat_id in sorted(set(routed) | set(digests), key=str):
+            sent[chat_id] = self.send_multiple_jobs(routed.get(chat_id, []), chat_id=chat_id)
+            self.send_digest(digests.get(chat_id, []), chat_id=chat_id)
+        return sent
+    
+    def send_digest(self, jobs, chat_id=None):
+        """Send lower-ranked jobs as one compact message"""
+        if not jobs:
+            return
+        return self.send_message(self.format_digest(jobs), chat_id=chat_id)
+    
+    def format_digest(self, jobs):
+        """One line per job, cut off to fit in a single Telegram message"""
+        message = f"📰 <b>Also new: {len(jobs)} more job(s)</b>\n\n"
+        for i, job in enumerate(jobs):
+            title = html.escape(job.get('title') or 'N/A')
+            line = f"<a href='{job['url']}'>{title}</a>" if job.get('url') not in (None, "N/A") else title
+            line = f"• {line} - {html.escape(job.get('company') or 'N/A')}\n"
+            if len(message) + len(line) > MAX_MESSAGE_LENGTH - 40:
+                message += f"…and {len(jobs) - i} more"
+                break
+            message += line
+        return message
+    
+    def format_summary(self, jobs):
+        """Header message sent before a batch of alerts"""
+        summary = f"🎯 <b>New Job Alerts!</b>\n\n"
+        summary += f"Found {len(jobs)} new job(s)\n"
+        summary += f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        summary += "━━━━━━━━━━━━━━━━━━━━"
+        return summary
     
     def format_job_message(self, job, index=None):
         """Format job data as HTML message"""
@@ -99,11 +197,27 @@ class TelegramNotifier:
             message += f"📍 <b>Location:</b> {location}\n"
         
         message += f"🕒 <b>Posted:</b> {job['posted_date']}\n"
+        
+        # Extra fields from the detail page, when enrichment is enabled
+        if job.get('seniority'):
+            message += f"🎓 <b>Seniority:</b> {html.escape(job['seniority'])}\n"
+        if job.get('employment_type'):
+            message += f"📄 <b>Type:</b> {html.escape(job['employment_type'])}\n"
+        if job.get('applicants'):
+            message += f"👥 <b>Applicants:</b> {html.escape(job['applicants'])}\n"
+        
         message += f"🔍 <b>Search Term:</b> {job['search_term']}\n\n"
         
+        if job.get('description'):
+            snippet = job['description'][:DESCRIPTION_PREVIEW_LENGTH]
+            if len(job['description']) > DESCRIPTION_PREVIEW_LENGTH:
+                snippet = snippet.rsplit(' ', 1)[0] + '…'
+            message += f"📝 {html.escape(snippet)}\n\n"
+        
         if job['url'] != "N/A":
             message += f"🔗 <a href='{job['url']}'>Click here to view full job details</a>\n"
-            message += f"\n💡 <i>Some details may be hidden by LinkedIn. Click the link above to see complete job information.</i>\n"
+            if not job.get('description'):
+                message += f"\n💡 <i>Some details may be hidden by LinkedIn. Click the link above to see complete job information.</i>\n"
         
         message += "\n━━━━━━━━━━━━━━━━━━━━"
         
@@ -114,22 +228,40 @@ class TelegramNotifier:
         url = f"{self.api_url}/getMe"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('ok'):
                     bot_info = data.get('result', {})
-                    print(f"✅ Connected to Telegram Bot: @{bot_info.get('username')}")
+                    logger.info(f"✅ Connected to Telegram Bot: @{bot_info.get('username')}")
                     return True
             
-            print(f"❌ Telegram connection failed: {response.text}")
+            logger.error(f"❌ Telegram connection failed: {response.text}")
             return False
             
         except Exception as e:
-            print(f"❌ Error testing Telegram connection: {str(e)}")
+            logger.error(f"❌ Error testing Telegram connection: {str(e)}")
             return False
     
+    def get_updates(self, offset=None, timeout=25):
+        """Long-poll for incoming messages; returns a list of updates"""
+        url = f"{self.api_url}/getUpdates"
+        
+        payload = {
+            'timeout': timeout,
+            'allowed_updates': ['message']
+        }
+        if offset is not None:
+            payload['offset'] = offset
+        
+        # The HTTP timeout has to outlast Telegram's long-poll timeout
+        response = self.session.post(url, json=payload, timeout=timeout + 10)
+        data = response.json()
+        if not data.get('ok'):
+            raise RuntimeError(data.get('description', 'getUpdates failed'))
+        return data.get('result', [])
+    
     def get_chat_info(self):
         """Get information about the chat"""
         url = f"{self.api_url}/getChat"
@@ -139,7 +271,7 @@ class TelegramNotifier:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.session.post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -149,7 +281,7 @@ class TelegramNotifier:
             return None
             
         except Exception as e:
-            print(f"❌ Error getting chat info: {str(e)}")
+            logger.error(f"❌ Error getting chat info: {str(e)}")
             return None
 
 
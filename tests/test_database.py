@@ -0,0 +1,30 @@
+"""
+JobDatabase search, including the LIKE fallback used without FTS5
+"""
+from database import JobDatabase
+
+
+def make_db(tmp_path, titles):
+    db = JobDatabase(str(tmp_path / 'jobs.db'))
+    for n, title in enumerate(titles):
+        db.add_job({
+            'job_id': f'job{n}', 'title': title, 'company': 'Acme', 'location': 'India',
+            'url': f'https://example.com/{n}', 'posted_date': '1 day ago', 'search_term': 'engineer',
+            'scraped_at': '2024-01-01 00:00:00',
+        })
+    return db
+
+
+def test_like_fallback_matches_wildcards_literally(tmp_path):
+    db = make_db(tmp_path, ['100% Remote Engineer', 'Remote Engineer', 'data_engineer', 'dataXengineer',
+                            'C:\\Tools Admin'])
+    db.fts_enabled = False
+
+    def titles(query):
+        return sorted(job['title'] for job in db.search_jobs(query))
+
+    assert titles('100%') == ['100% Remote Engineer']
+    assert titles('%') == ['100% Remote Engineer']
+    assert titles('data_') == ['data_engineer']
+    assert titles('C:\\') == ['C:\\Tools Admin']
+    assert titles('remote') == ['100% Remote Engineer', 'Remote Engineer']
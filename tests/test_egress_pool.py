@@ -0,0 +1,190 @@
+"""
+EgressPool: endpoint selection, rate budgets, cooldowns and retries, with a fake clock and sessions
+"""
+import asyncio
+
+import pytest
+
+from egress_pool import Endpoint, EgressPool, EgressUnavailable
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ''
+
+
+class FakeSession:
+    """Answers with the given statuses in turn (an exception instance is raised)"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes) or [200]
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+    def close(self):
+        pass
+
+
+def make_pool(clock, *sessions, rate=1, capacity=1, **kwargs):
+    endpoints = [Endpoint(f"e{i}", session, rate=rate, capacity=capacity, clock=clock)
+                 for i, session in enumerate(sessions)]
+    return EgressPool(endpoints, clock=clock, **kwargs), endpoints
+
+
+def test_picks_the_healthiest_endpoint(clock):
+    pool, (a, b) = make_pool(clock, FakeSession(), FakeSession())
+    a.success = 0.5
+
+    endpoint, delay = pool._pick()
+
+    assert endpoint is b
+    assert delay == 0
+    assert b.in_flight == 1
+
+
+def test_in_flight_requests_spread_traffic(clock):
+    pool, (a, b) = make_pool(clock, FakeSession(), FakeSession())
+
+    first, _ = pool._pick()
+    second, _ = pool._pick()
+
+    assert {first, second} == {a, b}
+
+
+def test_endpoints_without_budget_are_passed_over(clock):
+    pool, (a, b) = make_pool(clock, FakeSession(), FakeSession(), rate=1, capacity=1)
+    b.success = 0.5
+
+    assert pool._pick() == (a, 0)
+    # a spent its token: b goes next even though it is less healthy
+    assert pool._pick() == (b, 0)
+    # Both spent: the request waits for the next token
+    endpoint, delay = pool._pick()
+    assert delay == pytest.approx(1.0)
+
+    clock.now += 2
+    assert a.bucket.available() == pytest.approx(1)
+    assert b.bucket.available() == pytest.approx(1)
+
+
+def test_from_settings_endpoints_share_the_pool_clock(clock):
+    pool = EgressPool.from_settings(proxies=['http://user:pw@proxy.test:3128'], rate=2, clock=clock)
+    [endpoint] = pool.endpoints
+
+    assert endpoint.name == 'http://proxy.test:3128'
+    assert pool.clock is clock and endpoint.bucket.clock is clock
+    assert [endpoint.bucket.try_acquire() for _ in range(2)] == [True, False]
+    clock.now += 0.5
+    assert endpoint.bucket.try_acquire()
+
+
+def test_throttled_endpoint_cools_down_and_is_skipped(clock):
+    pool, (a, b) = make_pool(clock, FakeSession(), FakeSession(), cooldown=60)
+    pool._pick()
+    pool.record(a, 429)
+
+    assert a.cooldown_until == clock.now + 60
+    assert pool._pick()[0] is b
+
+    # Back in rotation once the cooldown is over
+    clock.now += 61
+    b.cooldown_until = clock.now + 60
+    assert pool._pick()[0] is a
+
+
+def test_cooldowns_in_a_row_double_until_a_success(clock):
+    pool, (a,) = make_pool(clock, FakeSession(), cooldown=60)
+
+    lengths = []
+    for _ in range(6):
+        a.in_flight += 1
+        pool.record(a, 999)
+        lengths.append(a.cooldown_until - clock.now)
+        clock.now = a.cooldown_until
+    assert lengths == [60, 120, 240, 480, 960, 960]
+
+    a.in_flight += 1
+    pool.record(a, 200, latency=0.1)
+    a.in_flight += 1
+    pool.record(a, 429)
+    assert a.cooldown_until - clock.now == 60
+
+
+def test_errors_cool_down_only_after_max_failures(clock):
+    pool, (a,) = make_pool(clock, FakeSession(), cooldown=60, max_failures=3)
+
+    for _ in range(2):
+        a.in_flight += 1
+        pool.record(a)
+    assert a.cooldown_until <= clock.now
+
+    a.in_flight += 1
+    pool.record(a)
+    assert a.cooldown_until == clock.now + 60
+
+
+def test_failures_during_a_cooldown_do_not_extend_it(clock):
+    pool, (a,) = make_pool(clock, FakeSession(), cooldown=60)
+    a.in_flight = 2
+    pool.record(a, 429)
+    pool.record(a, 429)
+
+    assert a.cooldown_until == clock.now + 60
+    assert a.strikes == 1
+
+
+def test_all_endpoints_cooling_raises(clock):
+    pool, (a, b) = make_pool(clock, FakeSession(429), FakeSession(429))
+
+    assert pool.get('http://example.test').status_code == 429
+    with pytest.raises(EgressUnavailable):
+        pool.get('http://example.test')
+
+
+def test_retry_goes_to_another_endpoint(clock):
+    throttled, healthy = FakeSession(429), FakeSession(200)
+    pool, (a, b) = make_pool(clock, throttled, healthy)
+
+    response = pool.get('http://example.test')
+
+    assert response.status_code == 200
+    assert (throttled.calls, healthy.calls) == (1, 1)
+    assert a.in_flight == b.in_flight == 0
+
+
+def test_retry_never_reuses_the_endpoint_that_failed(clock):
+    session = FakeSession(ConnectionError('refused'), 200)
+    pool, _ = make_pool(clock, session)
+
+    with pytest.raises(ConnectionError):
+        pool.get('http://example.test')
+    assert session.calls == 1
+
+
+def test_request_async_holds_the_limit_only_while_sending(clock):
+    session = FakeSession(200)
+    pool, (a,) = make_pool(clock, session)
+    # Nearly empty bucket: the request has to wait (10ms) for a token first
+    a.bucket.tokens = 0.99
+    held = []
+
+    async def main():
+        limit = asyncio.Semaphore(1)
+        original = session.request
+        session.request = lambda *args, **kwargs: held.append(limit.locked()) or original(*args, **kwargs)
+
+        request = asyncio.ensure_future(pool.request_async('GET', 'http://example.test', limit=limit))
+        await asyncio.sleep(0)
+        waiting_for_token = limit.locked()
+        response = await request
+        return response.status_code, waiting_for_token, limit.locked()
+
+    assert asyncio.run(main()) == (200, False, False)
+    assert held == [True]
@@ -0,0 +1,75 @@
+"""
+KeywordMatcher whole-word and overlapping matches, and JobFilter rules
+"""
+from job_filter import JobFilter, KeywordMatcher
+
+
+def test_matches_whole_words_only_ignoring_case_and_spacing():
+    matcher = KeywordMatcher(['Lead', 'Data  Engineer'])
+
+    assert matcher.find('Tech LEAD, data   engineer') == {'lead', 'data engineer'}
+    assert matcher.find('Leadership role, Big Data Engineering') == set()
+    assert matcher.find('') == set()
+    assert matcher.find(None) == set()
+
+
+def test_keywords_with_punctuation():
+    matcher = KeywordMatcher(['Sr.', 'C++', '.NET'])
+
+    assert matcher.find('Sr. C++ / .NET Developer') == {'sr.', 'c++', '.net'}
+    assert matcher.find('Src C+ NETwork') == set()
+
+
+def test_overlapping_keywords_are_all_found():
+    matcher = KeywordMatcher(['site reliability', 'reliability engineer'])
+
+    assert matcher.find('Site Reliability Engineer') == {'site reliability', 'reliability engineer'}
+
+
+def test_keywords_inside_a_longer_match_are_found():
+    matcher = KeywordMatcher(['team lead', 'team', 'lead', 'sr', 'sr.'])
+
+    assert matcher.find('Sr. Team Lead') == {'team lead', 'team', 'lead', 'sr', 'sr.'}
+    assert matcher.find('Team Leader') == {'team'}
+
+
+def test_no_keywords_matches_nothing():
+    assert KeywordMatcher([]).find('anything') == set()
+    assert KeywordMatcher(['', '  ']).find('anything') == set()
+
+
+def job(title, company='Acme', search_term='DevOps Engineer'):
+    return {'title': title, 'company': company, 'search_term': search_term}
+
+
+def test_job_filter_rules_and_per_term_profiles():
+    job_filter = JobFilter({
+        '*': {'exclude_title': ['Senior', 'Lead'], 'exclude_company': ['Staffing']},
+        'Cloud Engineer': {'include_title': ['AWS', 'Azure'], 'require_title': ['Engineer']},
+    })
+    jobs = [
+        job('DevOps Engineer'),
+        job('Senior DevOps Engineer'),
+        job('DevOps Engineer', company='Best Staffing Co'),
+        job('AWS Cloud Engineer', search_term='Cloud Engineer'),
+        job('GCP Cloud Engineer', search_term='Cloud Engineer'),
+        job('Azure Cloud Architect', search_term='cloud  engineer'),
+        job('Azure Cloud Engineer Lead', search_term='Cloud Engineer'),
+    ]
+
+    kept, removed = job_filter.apply(jobs)
+
+    assert [j['title'] for j in kept] == ['DevOps Engineer', 'AWS Cloud Engineer']
+    assert removed == {
+        "*: exclude_title 'senior'": 1,
+        "*: exclude_company 'staffing'": 1,
+        'Cloud Engineer: include_title': 1,
+        'Cloud Engineer: require_title': 1,
+        "Cloud Engineer: exclude_title 'lead'": 1,
+    }
+    assert job_filter.stats == removed
+
+
+def test_empty_filter_keeps_everything():
+    jobs = [job('Senior Lead')]
+    assert JobFilter({}).apply(jobs) == (jobs, {})
@@ -0,0 +1,75 @@
+"""
+JobRanker scores and top-K selection, and split_top_k per chat
+"""
+from datetime import datetime
+
+from job_ranking import JobRanker, split_top_k
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def job(n, title='Engineer', company='Acme', posted_at='2024-06-01 12:00:00', description=''):
+    return {'job_id': f'job{n}', 'title': title, 'company': company,
+            'posted_at': posted_at, 'description': description}
+
+
+def test_score_adds_keyword_company_and_freshness_weights():
+    ranker = JobRanker({
+        'keywords': {'Kubernetes': 2, 'Terraform': 1.5},
+        'companies': {'Staffing Agency': -3},
+        'freshness_weight': 1.0,
+        'freshness_half_life_hours': 24,
+    })
+    jobs = [
+        job(0, title='Kubernetes Engineer', description='Terraform and AWS'),
+        job(1, company='Some Staffing Agency'),
+        job(2, posted_at='2024-05-31 12:00:00'),
+        job(3, posted_at='N/A'),
+    ]
+
+    assert ranker.score(jobs, now=NOW) == [4.5, -2.0, 0.5, 0.0]
+    assert [j['score'] for j in jobs] == [4.5, -2.0, 0.5, 0.0]
+
+
+def test_rank_returns_the_k_best_then_the_rest_best_first():
+    ranker = JobRanker({'keywords': {'Kubernetes': 1, 'Terraform': 2}, 'freshness_weight': 0})
+    jobs = [
+        job(0),
+        job(1, title='Terraform Engineer'),
+        job(2, title='Kubernetes Engineer'),
+        job(3, title='Kubernetes Terraform Engineer'),
+    ]
+
+    top, rest = ranker.rank(jobs, k=2, now=NOW)
+
+    assert [j['job_id'] for j in top] == ['job3', 'job1']
+    assert [j['job_id'] for j in rest] == ['job2', 'job0']
+
+
+def test_rank_ties_keep_scrape_order():
+    ranker = JobRanker({'freshness_weight': 0})
+    jobs = [job(n) for n in range(5)]
+
+    top, rest = ranker.rank(jobs, k=3, now=NOW)
+
+    assert [j['job_id'] for j in top] == ['job0', 'job1', 'job2']
+    assert [j['job_id'] for j in rest] == ['job3', 'job4']
+
+
+def test_split_top_k_picks_the_best_and_keeps_the_rest_in_order():
+    jobs = [dict(job(n), score=score) for n, score in enumerate([1, 5, 3, 5, 0])]
+
+    top, rest = split_top_k(jobs, 2)
+
+    assert [j['job_id'] for j in top] == ['job1', 'job3']
+    assert [j['job_id'] for j in rest] == ['job0', 'job2', 'job4']
+
+
+def test_split_top_k_without_k_sends_everything_best_first():
+    jobs = [dict(job(n), score=score) for n, score in enumerate([1, 5, 3])]
+
+    top, rest = split_top_k(jobs, None)
+
+    assert [j['job_id'] for j in top] == ['job1', 'job2', 'job0']
+    assert rest == []
+    assert split_top_k(jobs, 10) == (top, [])
@@ -0,0 +1,87 @@
+"""
+TokenBucket and KeyedRateLimiter, with a fake clock
+"""
+import asyncio
+
+import pytest
+
+import rate_limiter
+from rate_limiter import KeyedRateLimiter, TokenBucket
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_default_capacity_is_one_second_of_rate_but_at_least_one():
+    assert TokenBucket(0.5).capacity == 1
+    assert TokenBucket(5).capacity == 5
+
+
+def test_burst_up_to_capacity_then_refill_at_rate(clock):
+    bucket = TokenBucket(2, capacity=3, clock=clock)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert bucket.available() == pytest.approx(1)
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_refill_stops_at_capacity(clock):
+    bucket = TokenBucket(2, capacity=3, clock=clock)
+    bucket.try_acquire()
+
+    clock.now += 60
+    assert bucket.available() == 3
+
+
+def test_reserve_queues_callers_in_order(clock):
+    bucket = TokenBucket(2, capacity=1, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays == [0, pytest.approx(0.5), pytest.approx(1.0), pytest.approx(1.5)]
+    assert bucket.available() == pytest.approx(-3)
+    # try_acquire never jumps the queue
+    clock.now += 1.0
+    assert not bucket.try_acquire()
+
+
+def test_acquire_sleeps_for_the_reserved_delay(clock, monkeypatch):
+    bucket = TokenBucket(4, capacity=1, clock=clock)
+    slept = []
+    monkeypatch.setattr(rate_limiter.time, 'sleep', slept.append)
+
+    bucket.acquire()
+    bucket.acquire()
+
+    assert slept == [pytest.approx(0.25)]
+
+
+def test_acquire_async_waits_on_the_loop(clock, monkeypatch):
+    bucket = TokenBucket(10, capacity=1, clock=clock)
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(rate_limiter.asyncio, 'sleep', fake_sleep)
+
+    async def main():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(main())
+    assert slept == [pytest.approx(0.1)]
+
+
+def test_keyed_limiter_keeps_one_bucket_per_key(clock):
+    limiter = KeyedRateLimiter(1, capacity=1, clock=clock)
+
+    assert limiter.bucket('chat-a') is limiter.bucket('chat-a')
+    assert limiter.bucket('chat-a').try_acquire()
+    assert not limiter.bucket('chat-a').try_acquire()
+    assert limiter.bucket('chat-b').try_acquire()
@@ -0,0 +1,100 @@
+"""
+RetentionTask: old jobs are archived before they are deleted, and freed space is reclaimed
+"""
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from bot_state import BotState
+from database import JobDatabase
+from retention import RetentionTask
+
+
+def make_db(tmp_path, old=3, recent=2):
+    db = JobDatabase(str(tmp_path / 'jobs.db'))
+    for n in range(old + recent):
+        db.add_job({
+            'job_id': f'job{n}', 'title': f'Engineer {n}', 'company': 'Acme', 'location': 'India',
+            'url': f'https://example.com/{n}', 'posted_date': '1 day ago', 'search_term': 'engineer',
+            'scraped_at': '2024-01-01 00:00:00',
+        })
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("UPDATE jobs SET created_at = '2000-01-01 00:00:00' WHERE rowid <= ?", (old,))
+    conn.commit()
+    conn.close()
+    return db
+
+
+def job_ids(db):
+    conn = sqlite3.connect(db.db_path)
+    ids = sorted(row[0] for row in conn.execute('SELECT job_id FROM jobs'))
+    conn.close()
+    return ids
+
+
+def test_old_jobs_are_archived_then_deleted(tmp_path):
+    db = make_db(tmp_path)
+    task = RetentionTask(db, days=30, batch_size=2, pause=0, archive_dir=str(tmp_path / 'archive'))
+
+    jobs_deleted, _ = task.run()
+
+    assert jobs_deleted == 3
+    assert job_ids(db) == ['job3', 'job4']
+    [archive] = (tmp_path / 'archive').iterdir()
+    with gzip.open(archive, 'rt', encoding='utf-8') as f:
+        archived = [json.loads(line) for line in f]
+    assert sorted(row['job_id'] for row in archived) == ['job0', 'job1', 'job2']
+    assert all('rowid' not in row for row in archived)
+
+
+def test_failed_archive_write_keeps_the_jobs(tmp_path, monkeypatch):
+    db = make_db(tmp_path)
+    task = RetentionTask(db, days=30, pause=0, archive_dir=str(tmp_path / 'archive'))
+
+    def disk_full(path, rows):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(task, '_archive', disk_full)
+    with pytest.raises(OSError):
+        task.run()
+
+    assert job_ids(db) == ['job0', 'job1', 'job2', 'job3', 'job4']
+
+
+def test_without_archive_old_jobs_are_just_deleted(tmp_path):
+    db = make_db(tmp_path)
+    jobs_deleted, _ = RetentionTask(db, days=30, pause=0).run()
+
+    assert jobs_deleted == 3
+    assert job_ids(db) == ['job3', 'job4']
+
+
+def test_deletions_are_taken_out_of_the_bot_state(tmp_path):
+    db = make_db(tmp_path)
+    state = BotState()
+    state.load_from_db(db)
+    assert state.snapshot()['total_jobs'] == 5
+
+    RetentionTask(db, days=30, pause=0, state=state).run()
+
+    assert state.snapshot()['total_jobs'] == 2
+
+
+def test_old_databases_are_converted_to_incremental_vacuum(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE jobs (job_id TEXT PRIMARY KEY, title TEXT NOT NULL, company TEXT, location TEXT, '
+                 'url TEXT, posted_date TEXT, search_term TEXT, scraped_at TEXT, notified_at TEXT, '
+                 'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+    conn.commit()
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 0
+    conn.close()
+
+    db = JobDatabase(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    conn.close()
+    assert db.incremental_vacuum() is True